@@ -1,12 +1,65 @@
 """Test configuration and fixtures."""
 
 import sqlite3
+from datetime import date
 from decimal import Decimal
+from typing import Any
 
-from sqlalchemy import Connection, text
+from sqlalchemy import Connection, event, text
+from sqlalchemy.engine import Engine
 
 # Register Decimal adapter for SQLite tests (exact decimal text, no float rounding)
 sqlite3.register_adapter(Decimal, str)
+# Store dates as ISO text explicitly (sqlite3's built-in date adapter is deprecated)
+sqlite3.register_adapter(date, date.isoformat)
+
+
+@event.listens_for(Engine, "connect")
+def _fast_sqlite_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+    """Drop durability on SQLite test databases: they are disposable.
+
+    Applies to every engine created during the test run, including the ones the
+    CLI builds from DATABASE_URL. Locking stays NORMAL so the CLI and the test can
+    both open the same file.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def run_script(conn: Connection, script: str) -> None:
+    """Run a multi-statement SQL script (schema DDL, literal seeds) in one call.
+
+    SQLAlchemy executes one statement at a time, so the script goes straight to
+    sqlite3's executescript(). That COMMITs any open transaction first: call it
+    while building a fixture, never inside a test's rollback transaction.
+    """
+    conn.connection.driver_connection.executescript(script)
+
+
+# Seed statements for the canonical GL tables, shared by the schema-per-module
+# test files; pass a list of dicts to any of them for an executemany batch.
+INS_ACCOUNT = text(
+    "INSERT INTO accounts (id, code, name, type, is_cash) "
+    "VALUES (:id, :code, :name, :type, :is_cash)"
+)
+INS_PLAID = text(
+    "INSERT INTO plaid_accounts "
+    "(plaid_account_id, name, type, subtype, currency) "
+    "VALUES (:plaid_account_id, :name, :type, :subtype, :currency)"
+)
+INS_LINK = text(
+    "INSERT INTO account_links (plaid_account_id, account_id) "
+    "VALUES (:plaid_account_id, :account_id)"
+)
+INS_LINE = text(
+    "INSERT INTO journal_lines (entry_id, account_id, side, amount) "
+    "VALUES (:entry_id, :account_id, :side, :amount)"
+)
 
 
 def seed_account(
@@ -4,91 +4,83 @@ from __future__ import annotations
 
 import importlib
 import json
-import os
-import tempfile
-from pathlib import Path
-from typing import TYPE_CHECKING
+import shutil
+import sqlite3
+from contextlib import closing
+from typing import TYPE_CHECKING, NamedTuple
 from unittest.mock import patch
 
 import pytest
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from pathlib import Path
 from sqlalchemy import create_engine, text
 from typer.testing import CliRunner
 
 runner = CliRunner()
 
 
-@pytest.fixture
-def temp_db() -> Iterator[str]:
-    """Create a temporary SQLite database for testing."""
-    fd, path = tempfile.mkstemp(suffix=".db")
-    os.close(fd)
-    db_url = f"sqlite:///{path}"
-
-    # Initialize schema
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
-        # Create minimal tables needed for testing
-        conn.execute(
-            text("""
-            CREATE TABLE plaid_accounts (
-                plaid_account_id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                subtype TEXT NOT NULL,
-                currency CHAR(3) NOT NULL DEFAULT 'USD'
-            )
-        """)
-        )
-
-        conn.execute(
-            text("""
-            CREATE TABLE ingest_accounts (
-                item_id TEXT NOT NULL,
-                plaid_account_id TEXT NOT NULL,
-                PRIMARY KEY (item_id, plaid_account_id)
-            )
-        """)
-        )
+_PLAID_ACCOUNTS_DDL = """
+CREATE TABLE plaid_accounts (
+    plaid_account_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    subtype TEXT NOT NULL,
+    currency CHAR(3) NOT NULL DEFAULT 'USD'
+);
+"""
+
+_INGEST_ACCOUNTS_DDL = """
+CREATE TABLE ingest_accounts (
+    item_id TEXT NOT NULL,
+    plaid_account_id TEXT NOT NULL,
+    PRIMARY KEY (item_id, plaid_account_id)
+);
+"""
+
+
+@pytest.fixture(scope="session")
+def schema_templates(tmp_path_factory: pytest.TempPathFactory) -> dict[str, Path]:
+    """Build each schema variant once per session; tests copy the file they need."""
+    base = tmp_path_factory.mktemp("schema_templates")
+    variants = {
+        "full": _PLAID_ACCOUNTS_DDL + _INGEST_ACCOUNTS_DDL,
+        # Intentionally NOT creating ingest_accounts table
+        "no_ingest": _PLAID_ACCOUNTS_DDL,
+    }
+    templates = {}
+    for name, ddl in variants.items():
+        path = base / f"{name}.db"
+        with closing(sqlite3.connect(path)) as db:
+            db.executescript(ddl)
+        templates[name] = path
+    return templates
 
-    yield db_url
 
-    # Cleanup
-    Path(path).unlink()
+def _copy_template(template: Path, tmp_path: Path) -> str:
+    """Copy a schema template into the test's tmp_path and return its URL."""
+    path = tmp_path / "test.db"
+    shutil.copyfile(template, path)
+    return f"sqlite:///{path}"
 
 
 @pytest.fixture
-def temp_db_no_ingest_table() -> Iterator[str]:
-    """Create a temporary SQLite database without ingest_accounts table."""
-    fd, path = tempfile.mkstemp(suffix=".db")
-    os.close(fd)
-    db_url = f"sqlite:///{path}"
-
-    # Initialize minimal schema - missing ingest_accounts table
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
-        conn.execute(
-            text("""
-            CREATE TABLE plaid_accounts (
-                plaid_account_id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                subtype TEXT NOT NULL,
-                currency CHAR(3) NOT NULL DEFAULT 'USD'
-            )
-        """)
-        )
-        # Intentionally NOT creating ingest_accounts table
+def temp_db(schema_templates: dict[str, Path], tmp_path: Path) -> str:
+    """Create a temporary SQLite database for testing."""
+    return _copy_template(schema_templates["full"], tmp_path)
 
-    yield db_url
 
-    # Cleanup
-    Path(path).unlink()
+@pytest.fixture(autouse=True)
+def _clean_cli_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Skip .env loading and drop ambient Plaid credentials for every CLI run."""
+    monkeypatch.setenv("PFETL_SKIP_DOTENV", "1")
+    for var in ("PLAID_ACCESS_TOKEN", "PLAID_CLIENT_ID", "PLAID_SECRET", "PLAID_ENV"):
+        monkeypatch.delenv(var, raising=False)
 
 
-def test_filters_by_item_via_db_join(temp_db: str) -> None:
+def test_filters_by_item_via_db_join(
+    temp_db: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
     """list-plaid-accounts filters by item via DB join.
 
     Seed SQLite with plaid_accounts and raw_transactions.
@@ -123,10 +115,8 @@ def test_filters_by_item_via_db_join(temp_db: str) -> None:
         )
 
     # Test the command - import cli after patching env
+    monkeypatch.setenv("DATABASE_URL", temp_db)
     with (
-        patch.dict(
-            os.environ, {"DATABASE_URL": temp_db, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
         patch("dotenv.load_dotenv"),  # Prevent .env loading
         patch("etl.extract.fetch_accounts") as mock_fetch_accounts,
     ):
@@ -142,111 +132,71 @@ def test_filters_by_item_via_db_join(temp_db: str) -> None:
 
     assert result.exit_code == 0
     # Should show accounts for item_A only, not item_B
-    assert "acc_1" in result.output
-    assert "acc_2" in result.output
-    assert "acc_3" not in result.output
-
-
-def test_fails_fast_when_no_accounts_for_item(temp_db: str) -> None:
-    """list-plaid-accounts fails fast when no accounts found for item.
-
-    Scoping is available (table has data for other items), but not for item_Z.
-    Run: pfetl list-plaid-accounts --item-id item_Z.
-    Expect: exit 1; message: No Plaid accounts found for item_id: item_Z.
-    """
-    engine = create_engine(temp_db)
-
-    # Seed test data with accounts and prove scoping works for item_A
-    with engine.begin() as conn:
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype)
-            VALUES ('acc_1', 'Checking Account', 'depository', 'checking')
-        """)
-        )
-
-        # Insert ingest_accounts for item_A to prove scoping is available
-        conn.execute(
-            text("""
-            INSERT INTO ingest_accounts (item_id, plaid_account_id)
-            VALUES ('item_A', 'acc_1')
-        """)
-        )
-        # No ingest_accounts for item_Z
-
-    # Test the command - import cli after patching env
-    with (
-        patch.dict(
-            os.environ, {"DATABASE_URL": temp_db, "PFETL_SKIP_DOTENV": "1"}, clear=True
+    output = result.output
+    assert "acc_1" in output
+    assert "acc_2" in output
+    assert "acc_3" not in output
+
+
+class _FailFastCase(NamedTuple):
+    """One DB-path run that must exit 1 because item scoping cannot succeed."""
+
+    template: str
+    ingest_rows: tuple[tuple[str, str], ...]
+    item_id: str
+    expected_message: str
+
+
+@pytest.mark.parametrize(
+    "case",
+    [
+        # Scoping is available (ingest_accounts has item_A), but not for item_Z
+        pytest.param(
+            _FailFastCase(
+                "full",
+                (("item_A", "acc_1"),),
+                "item_Z",
+                "No Plaid accounts found for item_id: item_Z",
+            ),
+            id="no-accounts-for-item",
         ),
-        patch("dotenv.load_dotenv"),  # Prevent .env loading
-        patch("etl.extract.fetch_accounts") as mock_fetch_accounts,
-    ):
-        # Import and reload cli module to ensure it sees patched env
-        import cli
-
-        importlib.reload(cli)
-
-        # Make API call fail so it falls back to DB
-        mock_fetch_accounts.side_effect = Exception("No API access")
-
-        result = runner.invoke(cli.app, ["list-plaid-accounts", "--item-id", "item_Z"])
-
-    assert result.exit_code == 1
-    assert "No Plaid accounts found for item_id: item_Z" in result.output
-
-
-def test_fails_fast_when_item_scoping_unavailable(temp_db: str) -> None:
-    """list-plaid-accounts fails fast when item scoping unavailable.
-
-    Schema has plaid_accounts but ingest_accounts is empty (pre-ingest).
-    Run: pfetl list-plaid-accounts --item-id item_A.
-    Expect: exit 1; message: Cannot scope by item_id yet. Ingest this item first.
-    """
-    engine = create_engine(temp_db)
-
-    # Seed test data with accounts but no ingest_accounts at all
-    with engine.begin() as conn:
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype)
-            VALUES ('acc_1', 'Checking Account', 'depository', 'checking')
-        """)
-        )
-        # ingest_accounts table exists but is empty
-
-    # Test the command - import cli after patching env
-    with (
-        patch.dict(
-            os.environ, {"DATABASE_URL": temp_db, "PFETL_SKIP_DOTENV": "1"}, clear=True
+        # ingest_accounts exists but is empty (pre-ingest)
+        pytest.param(
+            _FailFastCase(
+                "full",
+                (),
+                "item_A",
+                "Cannot scope by item_id yet. Ingest this item first",
+            ),
+            id="item-scoping-unavailable",
         ),
-        patch("dotenv.load_dotenv"),  # Prevent .env loading
-        patch("etl.extract.fetch_accounts") as mock_fetch_accounts,
-    ):
-        # Import and reload cli module to ensure it sees patched env
-        import cli
-
-        importlib.reload(cli)
-
-        # Make API call fail so it falls back to DB
-        mock_fetch_accounts.side_effect = Exception("No API access")
-
-        result = runner.invoke(cli.app, ["list-plaid-accounts", "--item-id", "item_A"])
-
-    assert result.exit_code == 1
-    assert "Cannot scope by item_id yet. Ingest this item first" in result.output
-
-
-def test_fails_fast_when_ingest_table_missing(temp_db_no_ingest_table: str) -> None:
-    """list-plaid-accounts fails fast when ingest_accounts table doesn't exist.
+        # Schema only has plaid_accounts (no ingest_accounts table)
+        pytest.param(
+            _FailFastCase(
+                "no_ingest",
+                (),
+                "item_A",
+                "Cannot scope by item_id yet. Ingest this item first",
+            ),
+            id="ingest-table-missing",
+        ),
+    ],
+)
+def test_fails_fast_without_item_scoping(
+    schema_templates: dict[str, Path],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    case: _FailFastCase,
+) -> None:
+    """list-plaid-accounts fails fast when the DB cannot scope accounts to the item.
 
-    Schema only has plaid_accounts (no ingest_accounts table).
-    Run: pfetl list-plaid-accounts --item-id item_A.
-    Expect: exit 1; message: Cannot scope by item_id yet. Ingest this item first.
+    Seed acc_1 plus the case's ingest_accounts rows, make the API path fail.
+    Run: pfetl list-plaid-accounts --item-id <case.item_id>.
+    Expect: exit 1; the case's message.
     """
-    engine = create_engine(temp_db_no_ingest_table)
+    db_url = _copy_template(schema_templates[case.template], tmp_path)
+    engine = create_engine(db_url)
 
-    # Seed test data with plaid_accounts only
     with engine.begin() as conn:
         conn.execute(
             text("""
@@ -254,14 +204,21 @@ def test_fails_fast_when_ingest_table_missing(temp_db_no_ingest_table: str) -> N
             VALUES ('acc_1', 'Checking Account', 'depository', 'checking')
         """)
         )
+        if case.ingest_rows:
+            conn.execute(
+                text(
+                    "INSERT INTO ingest_accounts (item_id, plaid_account_id) "
+                    "VALUES (:item_id, :plaid_account_id)"
+                ),
+                [
+                    {"item_id": item_id, "plaid_account_id": account_id}
+                    for item_id, account_id in case.ingest_rows
+                ],
+            )
 
     # Test the command - import cli after patching env
+    monkeypatch.setenv("DATABASE_URL", db_url)
     with (
-        patch.dict(
-            os.environ,
-            {"DATABASE_URL": temp_db_no_ingest_table, "PFETL_SKIP_DOTENV": "1"},
-            clear=True,
-        ),
         patch("dotenv.load_dotenv"),  # Prevent .env loading
         patch("etl.extract.fetch_accounts") as mock_fetch_accounts,
     ):
@@ -273,13 +230,15 @@ def test_fails_fast_when_ingest_table_missing(temp_db_no_ingest_table: str) -> N
         # Make API call fail so it falls back to DB
         mock_fetch_accounts.side_effect = Exception("No API access")
 
-        result = runner.invoke(cli.app, ["list-plaid-accounts", "--item-id", "item_A"])
+        result = runner.invoke(
+            cli.app, ["list-plaid-accounts", "--item-id", case.item_id]
+        )
 
     assert result.exit_code == 1
-    assert "Cannot scope by item_id yet. Ingest this item first" in result.output
+    assert case.expected_message in result.output
 
 
-def test_api_path_succeeds(temp_db: str) -> None:
+def test_api_path_succeeds(temp_db: str, monkeypatch: pytest.MonkeyPatch) -> None:
     """list-plaid-accounts API path succeeds when PLAID_ACCESS_TOKEN available.
 
     Mock fetch_accounts() to return stub with 2 accounts.
@@ -302,19 +261,12 @@ def test_api_path_succeeds(temp_db: str) -> None:
     ]
 
     # Test the command - import cli after patching env
+    monkeypatch.setenv("DATABASE_URL", temp_db)
+    monkeypatch.setenv("PLAID_ACCESS_TOKEN", "fake_token")
+    monkeypatch.setenv("PLAID_CLIENT_ID", "fake_client_id")
+    monkeypatch.setenv("PLAID_SECRET", "fake_secret")
+    monkeypatch.setenv("PLAID_ENV", "sandbox")
     with (
-        patch.dict(
-            os.environ,
-            {
-                "DATABASE_URL": temp_db,
-                "PLAID_ACCESS_TOKEN": "fake_token",
-                "PLAID_CLIENT_ID": "fake_client_id",
-                "PLAID_SECRET": "fake_secret",
-                "PLAID_ENV": "sandbox",
-                "PFETL_SKIP_DOTENV": "1",
-            },
-            clear=True,
-        ),
         patch("dotenv.load_dotenv"),  # Prevent .env loading
         patch("etl.extract.fetch_accounts") as mock_fetch_accounts,
     ):
@@ -330,13 +282,14 @@ def test_api_path_succeeds(temp_db: str) -> None:
         )
 
     assert result.exit_code == 0
-    assert "api_acc_1" in result.output
-    assert "api_acc_2" in result.output
-    assert "API Checking" in result.output
-    assert "API Savings" in result.output
+    output = result.output
+    assert "api_acc_1" in output
+    assert "api_acc_2" in output
+    assert "API Checking" in output
+    assert "API Savings" in output
 
 
-def test_json_output_format(temp_db: str) -> None:
+def test_json_output_format(temp_db: str, monkeypatch: pytest.MonkeyPatch) -> None:
     """list-plaid-accounts --json outputs valid JSON format."""
     # Mock API response (as dict)
     mock_accounts = [
@@ -349,19 +302,12 @@ def test_json_output_format(temp_db: str) -> None:
     ]
 
     # Test the command with --json flag - import cli after patching env
+    monkeypatch.setenv("DATABASE_URL", temp_db)
+    monkeypatch.setenv("PLAID_ACCESS_TOKEN", "fake_token")
+    monkeypatch.setenv("PLAID_CLIENT_ID", "fake_client_id")
+    monkeypatch.setenv("PLAID_SECRET", "fake_secret")
+    monkeypatch.setenv("PLAID_ENV", "sandbox")
     with (
-        patch.dict(
-            os.environ,
-            {
-                "DATABASE_URL": temp_db,
-                "PLAID_ACCESS_TOKEN": "fake_token",
-                "PLAID_CLIENT_ID": "fake_client_id",
-                "PLAID_SECRET": "fake_secret",
-                "PLAID_ENV": "sandbox",
-                "PFETL_SKIP_DOTENV": "1",
-            },
-            clear=True,
-        ),
         patch("dotenv.load_dotenv"),  # Prevent .env loading
         patch("etl.extract.fetch_accounts") as mock_fetch_accounts,
     ):
@@ -387,7 +333,7 @@ def test_json_output_format(temp_db: str) -> None:
     assert output_json[0]["subtype"] == "checking"
 
 
-def test_json_output_db_path(temp_db: str) -> None:
+def test_json_output_db_path(temp_db: str, monkeypatch: pytest.MonkeyPatch) -> None:
     """list-plaid-accounts --json via DB path outputs same JSON structure as API."""
     engine = create_engine(temp_db)
 
@@ -407,12 +353,8 @@ def test_json_output_db_path(temp_db: str) -> None:
         )
 
     # Test DB path (no PLAID_ACCESS_TOKEN)
-    with (
-        patch.dict(
-            os.environ, {"DATABASE_URL": temp_db, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
-        patch("dotenv.load_dotenv"),
-    ):
+    monkeypatch.setenv("DATABASE_URL", temp_db)
+    with patch("dotenv.load_dotenv"):
         import cli
 
         importlib.reload(cli)
@@ -435,7 +377,9 @@ def test_json_output_db_path(temp_db: str) -> None:
     ]
 
 
-def test_cli_respects_skip_dotenv_env(temp_db: str) -> None:
+def test_cli_respects_skip_dotenv_env(
+    temp_db: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
     """Test CLI respects PFETL_SKIP_DOTENV=1 and doesn't load .env file."""
     engine = create_engine(temp_db)
 
@@ -455,10 +399,8 @@ def test_cli_respects_skip_dotenv_env(temp_db: str) -> None:
         )
 
     # Test with PFETL_SKIP_DOTENV=1 - should not call load_dotenv()
+    monkeypatch.setenv("DATABASE_URL", temp_db)
     with (
-        patch.dict(
-            os.environ, {"DATABASE_URL": temp_db, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
         patch("dotenv.load_dotenv") as mock_load_dotenv,
         patch("etl.extract.fetch_accounts") as mock_fetch_accounts,
     ):
@@ -481,7 +423,7 @@ def test_cli_respects_skip_dotenv_env(temp_db: str) -> None:
 
 
 def test_list_accounts_without_token_uses_db_fallback_and_never_calls_fetch(
-    temp_db: str,
+    temp_db: str, monkeypatch: pytest.MonkeyPatch
 ) -> None:
     """Test list-plaid-accounts without token uses DB fallback.
 
@@ -506,10 +448,8 @@ def test_list_accounts_without_token_uses_db_fallback_and_never_calls_fetch(
 
     # Test with no PLAID_ACCESS_TOKEN - should use DB fallback without calling
     # fetch_accounts
+    monkeypatch.setenv("DATABASE_URL", temp_db)
     with (
-        patch.dict(
-            os.environ, {"DATABASE_URL": temp_db, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
         patch("dotenv.load_dotenv"),
         patch("etl.extract.fetch_accounts") as mock_fetch_accounts,
     ):
@@ -530,7 +470,9 @@ def test_list_accounts_without_token_uses_db_fallback_and_never_calls_fetch(
     mock_fetch_accounts.assert_not_called()
 
 
-def test_list_accounts_with_token_calls_fetch_exactly_once(temp_db: str) -> None:
+def test_list_accounts_with_token_calls_fetch_exactly_once(
+    temp_db: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
     """Test list-plaid-accounts with token calls fetch_accounts exactly once."""
     # Mock Plaid account objects (as dicts, not MagicMock objects)
     mock_accounts = [
@@ -543,19 +485,12 @@ def test_list_accounts_with_token_calls_fetch_exactly_once(temp_db: str) -> None
     ]
 
     # Test with PLAID_ACCESS_TOKEN present - should call fetch_accounts exactly once
+    monkeypatch.setenv("DATABASE_URL", temp_db)
+    monkeypatch.setenv("PLAID_ACCESS_TOKEN", "test_token")
+    monkeypatch.setenv("PLAID_CLIENT_ID", "test_client_id")
+    monkeypatch.setenv("PLAID_SECRET", "test_secret")
+    monkeypatch.setenv("PLAID_ENV", "sandbox")
     with (
-        patch.dict(
-            os.environ,
-            {
-                "DATABASE_URL": temp_db,
-                "PLAID_ACCESS_TOKEN": "test_token",
-                "PLAID_CLIENT_ID": "test_client_id",
-                "PLAID_SECRET": "test_secret",
-                "PLAID_ENV": "sandbox",
-                "PFETL_SKIP_DOTENV": "1",
-            },
-            clear=True,
-        ),
         patch("dotenv.load_dotenv"),
         patch("etl.extract.fetch_accounts") as mock_fetch_accounts,
     ):
@@ -573,7 +508,8 @@ def test_list_accounts_with_token_calls_fetch_exactly_once(temp_db: str) -> None
 
     # Should succeed using API path (exit 0)
     assert result.exit_code == 0
-    assert "token_acc_1" in result.output
-    assert "Token Test Account" in result.output
+    output = result.output
+    assert "token_acc_1" in output
+    assert "Token Test Account" in output
     # Verify fetch_accounts was called exactly once due to token presence
     mock_fetch_accounts.assert_called_once()
@@ -3,166 +3,163 @@
 from __future__ import annotations
 
 import json
-from typing import Any
+from decimal import Decimal
+from typing import TYPE_CHECKING
 
+import pytest
 from cli import app
 from sqlalchemy import create_engine, text
 from typer.testing import CliRunner
 
+from tests.conftest import INS_ACCOUNT, INS_LINE, INS_LINK, INS_PLAID, run_script
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from sqlalchemy.engine import Engine
+
 runner = CliRunner()
 
 
-def _seed_minimal_gl(db_url: str) -> None:
-    engine = create_engine(db_url)
+# etl_events exists only so the CLI's event logging doesn't error.
+_SCHEMA_DDL = """
+CREATE TABLE accounts (
+    id INTEGER PRIMARY KEY,
+    code TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    is_cash BOOLEAN NOT NULL DEFAULT 0
+);
+CREATE TABLE journal_entries (
+    id INTEGER PRIMARY KEY,
+    txn_id TEXT UNIQUE NOT NULL,
+    txn_date DATE NOT NULL,
+    description TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    transform_version INTEGER NOT NULL,
+    item_id TEXT
+);
+CREATE TABLE journal_lines (
+    id INTEGER PRIMARY KEY,
+    entry_id INTEGER NOT NULL REFERENCES journal_entries(id),
+    account_id INTEGER NOT NULL REFERENCES accounts(id),
+    side TEXT NOT NULL,
+    amount NUMERIC(18,2) NOT NULL
+);
+CREATE TABLE plaid_accounts (
+    plaid_account_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    subtype TEXT NOT NULL,
+    currency TEXT NOT NULL
+);
+CREATE TABLE account_links (
+    id INTEGER PRIMARY KEY,
+    plaid_account_id TEXT UNIQUE NOT NULL,
+    account_id INTEGER NOT NULL REFERENCES accounts(id)
+);
+CREATE TABLE IF NOT EXISTS etl_events (
+    id INTEGER PRIMARY KEY,
+    event_type TEXT NOT NULL,
+    item_id TEXT,
+    row_counts TEXT,
+    started_at TEXT,
+    finished_at TEXT,
+    success BOOLEAN NOT NULL
+);
+"""
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> Iterator[Engine]:
+    """One engine per test on a tmp_path SQLite file, disposed at teardown."""
+    eng = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    yield eng
+    eng.dispose()
+
+
+def _seed_minimal_gl(engine: Engine) -> None:
     with engine.begin() as conn:
-        conn.execute(
-            text(
-                """
-                CREATE TABLE accounts (
-                    id INTEGER PRIMARY KEY,
-                    code TEXT UNIQUE NOT NULL,
-                    name TEXT NOT NULL,
-                    type TEXT NOT NULL,
-                    is_cash BOOLEAN NOT NULL DEFAULT 0
-                )
-                """
-            )
-        )
-        conn.execute(
-            text(
-                """
-                CREATE TABLE journal_entries (
-                    id INTEGER PRIMARY KEY,
-                    txn_id TEXT UNIQUE NOT NULL,
-                    txn_date DATE NOT NULL,
-                    description TEXT NOT NULL,
-                    currency TEXT NOT NULL,
-                    source_hash TEXT NOT NULL,
-                    transform_version INTEGER NOT NULL,
-                    item_id TEXT
-                )
-                """
-            )
-        )
-        conn.execute(
-            text(
-                """
-                CREATE TABLE journal_lines (
-                    id INTEGER PRIMARY KEY,
-                    entry_id INTEGER NOT NULL REFERENCES journal_entries(id),
-                    account_id INTEGER NOT NULL REFERENCES accounts(id),
-                    side TEXT NOT NULL,
-                    amount NUMERIC(18,2) NOT NULL
-                )
-                """
-            )
-        )
-        conn.execute(
-            text(
-                """
-                CREATE TABLE plaid_accounts (
-                    plaid_account_id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    type TEXT NOT NULL,
-                    subtype TEXT NOT NULL,
-                    currency TEXT NOT NULL
-                )
-                """
-            )
-        )
-        conn.execute(
-            text(
-                """
-                CREATE TABLE account_links (
-                    id INTEGER PRIMARY KEY,
-                    plaid_account_id TEXT UNIQUE NOT NULL,
-                    account_id INTEGER NOT NULL REFERENCES accounts(id)
-                )
-                """
-            )
-        )
+        run_script(conn, _SCHEMA_DDL)
 
         # Seed one cash account and one expense account; map only the cash account
         conn.execute(
-            text(
-                """
-                INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                    (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                    (2, 'Expenses:Dining', 'Dining', 'expense', 0)
-                """
-            )
+            INS_ACCOUNT,
+            [
+                {
+                    "id": 1,
+                    "code": "Assets:Bank:Checking",
+                    "name": "Checking",
+                    "type": "asset",
+                    "is_cash": 1,
+                },
+                {
+                    "id": 2,
+                    "code": "Expenses:Dining",
+                    "name": "Dining",
+                    "type": "expense",
+                    "is_cash": 0,
+                },
+            ],
         )
         conn.execute(
-            text(
-                """
-                INSERT INTO plaid_accounts (
-                    plaid_account_id, name, type, subtype, currency
-                )
-                VALUES ('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-                """
-            )
+            INS_PLAID,
+            {
+                "plaid_account_id": "plaid_checking",
+                "name": "Checking",
+                "type": "depository",
+                "subtype": "checking",
+                "currency": "USD",
+            },
         )
         conn.execute(
-            text(
-                """
-                INSERT INTO account_links (plaid_account_id, account_id)
-                VALUES ('plaid_checking', 1)
-                """
-            )
+            INS_LINK,
+            {"plaid_account_id": "plaid_checking", "account_id": 1},
         )
 
         # Seed balanced entry in Q1 with +150 cash movement
         conn.execute(
             text(
-                """
-                INSERT INTO journal_entries (
-                    id, txn_id, txn_date, description, currency,
-                    source_hash, transform_version
-                ) VALUES (
-                    1, 'q1-1', '2024-03-31', 'End of Q1 cash in', 'USD', 'hash', 1
-                )
-                """
-            )
+                "INSERT INTO journal_entries (id, txn_id, txn_date, description, "
+                "currency, source_hash, transform_version) VALUES "
+                "(:id, :txn_id, :txn_date, :description, :currency, :source_hash, "
+                ":transform_version)"
+            ),
+            {
+                "id": 1,
+                "txn_id": "q1-1",
+                "txn_date": "2024-03-31",
+                "description": "End of Q1 cash in",
+                "currency": "USD",
+                "source_hash": "hash",
+                "transform_version": 1,
+            },
         )
+        # cash increases by 150, expense offset
+        cash_in = Decimal("150.00")
         conn.execute(
-            text(
-                """
-                INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                    (1, 1, 'debit', 150.00),   -- cash increases by 150
-                    (1, 2, 'credit', 150.00)  -- expense offset
-                """
-            )
-        )
-
-        # Optional: create etl_events to avoid logging errors
-        conn.execute(
-            text(
-                """
-                CREATE TABLE IF NOT EXISTS etl_events (
-                    id INTEGER PRIMARY KEY,
-                    event_type TEXT NOT NULL,
-                    item_id TEXT,
-                    row_counts TEXT,
-                    started_at TEXT,
-                    finished_at TEXT,
-                    success BOOLEAN NOT NULL
-                )
-                """
-            )
+            INS_LINE,
+            [
+                {"entry_id": 1, "account_id": 1, "side": "debit", "amount": cash_in},
+                {"entry_id": 1, "account_id": 2, "side": "credit", "amount": cash_in},
+            ],
         )
 
 
-def test_reconcile_uses_balances_json_override(tmp_path: Any, monkeypatch: Any) -> None:
+def test_reconcile_uses_balances_json_override(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, engine: Engine
+) -> None:
     # Arrange: DB and balances file
-    db_url = f"sqlite:///{tmp_path / 'test.db'}"
-    _seed_minimal_gl(db_url)
+    _seed_minimal_gl(engine)
 
     balances_path = tmp_path / "balances.json"
     # Provide ending (AS-OF) balance 150.00 matching GL
     balances_path.write_text(json.dumps({"plaid_checking": 150.00}))
 
     # Point CLI to our SQLite DB and run without PLAID creds
-    monkeypatch.setenv("DATABASE_URL", db_url)
+    monkeypatch.setenv("DATABASE_URL", str(engine.url))
     out_json = tmp_path / "recon.json"
     result = runner.invoke(
         app,
@@ -3,377 +3,335 @@
 from __future__ import annotations
 
 import json
-from typing import TYPE_CHECKING, Any
+import re
+from contextlib import nullcontext
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, NamedTuple
 from unittest.mock import patch
+from uuid import uuid4
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
     from pathlib import Path
 
+    from sqlalchemy.engine import Connection, Engine
+
+import pytest
+import typer
 from sqlalchemy import create_engine, text
 from typer.testing import CliRunner
 
-runner = CliRunner()  # stderr/stdout are separate by default in typer
+from tests.conftest import run_script
 
+# typer's CliRunner already keeps stderr apart (no mix_stderr flag to pass)
+runner = CliRunner()
 
-def _create_test_schema_with_period(conn: Any) -> None:
-    """Create test database schema including period column in etl_events."""
-    conn.execute(
-        text("""
-        CREATE TABLE accounts (
-            id INTEGER PRIMARY KEY,
-            code TEXT UNIQUE NOT NULL,
-            name TEXT NOT NULL,
-            type TEXT NOT NULL,
-            is_cash BOOLEAN NOT NULL DEFAULT 0
-        )
-    """)
-    )
+# Rich colours help output; strip escape codes before matching option text
+_ANSI_ESCAPE_RE = re.compile(r"\x1b\[[0-9;]*m")
 
-    conn.execute(
-        text("""
-        CREATE TABLE journal_entries (
-            id INTEGER PRIMARY KEY,
-            txn_id TEXT UNIQUE NOT NULL,
-            txn_date DATE NOT NULL,
-            description TEXT NOT NULL,
-            currency TEXT NOT NULL,
-            source_hash TEXT NOT NULL,
-            transform_version INTEGER NOT NULL,
-            item_id TEXT
-        )
-    """)
-    )
 
-    conn.execute(
-        text("""
-        CREATE TABLE journal_lines (
-            id INTEGER PRIMARY KEY,
-            entry_id INTEGER NOT NULL REFERENCES journal_entries(id),
-            account_id INTEGER NOT NULL REFERENCES accounts(id),
-            side TEXT NOT NULL CHECK (side IN ('debit','credit')),
-            amount NUMERIC(18,2) NOT NULL CHECK (amount >= 0)
-        )
-    """)
-    )
+@pytest.fixture
+def db_url(monkeypatch: pytest.MonkeyPatch) -> str:
+    """Point the CLI at a per-test in-memory SQLite database.
 
-    conn.execute(
-        text("""
-        CREATE TABLE plaid_accounts (
-            plaid_account_id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            type TEXT NOT NULL,
-            subtype TEXT NOT NULL,
-            currency TEXT NOT NULL
-        )
-    """)
-    )
+    The unique name keeps tests (and xdist workers) apart; the CLI's own engine
+    reaches the same database because memdb shares "/"-named databases across
+    connections. Unlike mode=memory, the URL reads as a file path to SQLAlchemy,
+    so the CLI's plain create_engine() picks QueuePool without a deprecation.
+    """
+    url = f"sqlite:///file:/recon_{uuid4().hex}?vfs=memdb&uri=true"
+    monkeypatch.setenv("DATABASE_URL", url)
+    monkeypatch.setenv("PFETL_SKIP_DOTENV", "1")
+    return url
 
-    conn.execute(
-        text("""
-        CREATE TABLE account_links (
-            id INTEGER PRIMARY KEY,
-            plaid_account_id TEXT UNIQUE NOT NULL
-                REFERENCES plaid_accounts(plaid_account_id),
-            account_id INTEGER NOT NULL REFERENCES accounts(id)
-        )
-    """)
-    )
 
-    # ETL events table with period column per ADR
-    conn.execute(
-        text("""
-        CREATE TABLE etl_events (
-            id INTEGER PRIMARY KEY,
-            event_type TEXT NOT NULL,
-            item_id TEXT,
-            period TEXT,
-            success BOOLEAN NOT NULL,
-            row_counts TEXT NOT NULL,
-            started_at TEXT NOT NULL,
-            finished_at TEXT NOT NULL
-        )
-    """)
-    )
+@pytest.fixture
+def db_engine(db_url: str) -> Iterator[Engine]:
+    """Engine holding the in-memory database open; disposing it frees the DB."""
+    engine = create_engine(db_url)
+    with engine.connect():  # keep-alive: a memdb DB lives while one is open
+        yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_conn(db_engine: Engine) -> Iterator[Connection]:
+    """One connection per test, used for both seeding and post-run assertions."""
+    with db_engine.connect() as conn:
+        yield conn
+
+
+# etl_events carries the period column per ADR.
+_SCHEMA_DDL = """
+CREATE TABLE accounts (
+    id INTEGER PRIMARY KEY,
+    code TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    is_cash BOOLEAN NOT NULL DEFAULT 0
+);
+
+CREATE TABLE journal_entries (
+    id INTEGER PRIMARY KEY,
+    txn_id TEXT UNIQUE NOT NULL,
+    txn_date DATE NOT NULL,
+    description TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    transform_version INTEGER NOT NULL,
+    item_id TEXT
+);
+
+CREATE TABLE journal_lines (
+    id INTEGER PRIMARY KEY,
+    entry_id INTEGER NOT NULL REFERENCES journal_entries(id),
+    account_id INTEGER NOT NULL REFERENCES accounts(id),
+    side TEXT NOT NULL CHECK (side IN ('debit','credit')),
+    amount NUMERIC(18,2) NOT NULL CHECK (amount >= 0)
+);
+
+CREATE TABLE plaid_accounts (
+    plaid_account_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    subtype TEXT NOT NULL,
+    currency TEXT NOT NULL
+);
+
+CREATE TABLE account_links (
+    id INTEGER PRIMARY KEY,
+    plaid_account_id TEXT UNIQUE NOT NULL
+        REFERENCES plaid_accounts(plaid_account_id),
+    account_id INTEGER NOT NULL REFERENCES accounts(id)
+);
+
+CREATE TABLE etl_events (
+    id INTEGER PRIMARY KEY,
+    event_type TEXT NOT NULL,
+    item_id TEXT,
+    period TEXT,
+    success BOOLEAN NOT NULL,
+    row_counts TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT NOT NULL
+);
+"""
+
+
+# Seed statements shared by several tests, built once at import
+_INSERT_CHECKING_AND_OTHER_ACCOUNTS = text("""
+    INSERT INTO accounts (id, code, name, type, is_cash) VALUES
+        (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
+        (2, 'Expenses:Other', 'Other', 'expense', 0)
+""")
+
+_LINK_CHECKING_AND_CREDIT = text("""
+    INSERT INTO account_links (plaid_account_id, account_id) VALUES
+        ('plaid_checking', 1),
+        ('plaid_credit', 2)
+""")
+
+_INSERT_CHECKING_AND_SAVINGS_ACCOUNTS = text("""
+    INSERT INTO accounts (id, code, name, type, is_cash) VALUES
+        (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
+        (2, 'Assets:Bank:Savings', 'Savings', 'asset', 1)
+""")
+
+_INSERT_PLAID_CHECKING_AND_SAVINGS = text("""
+    INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
+    VALUES
+        ('plaid_checking', 'Checking', 'depository', 'checking', 'USD'),
+        ('plaid_savings', 'Savings', 'depository', 'savings', 'USD')
+""")
+
+_LINK_CHECKING_AND_SAVINGS = text("""
+    INSERT INTO account_links (plaid_account_id, account_id) VALUES
+        ('plaid_checking', 1),
+        ('plaid_savings', 2)
+""")
+
+
+# Live Plaid response listing only ONE of the two mapped cash accounts
+_LIVE_ACCOUNTS_CHECKING_ONLY: list[dict[str, Any]] = [
+    {
+        "account_id": "plaid_checking",
+        "name": "Checking",
+        "type": "depository",
+        "subtype": "checking",
+        "balances": {"current": 100.00},
+    }
+    # Missing: plaid_savings account
+]
+
+
+def _fetch_checking_only(_access_token: str) -> list[dict[str, Any]]:
+    """Stand-in for etl.extract.fetch_accounts that omits plaid_savings."""
+    return _LIVE_ACCOUNTS_CHECKING_ONLY
+
+
+def _fetch_accounts_unavailable(_access_token: str) -> list[dict[str, Any]]:
+    """Stand-in for etl.extract.fetch_accounts when the Plaid API is unreachable."""
+    msg = "API unavailable"
+    raise RuntimeError(msg)
+
+
+def _create_test_schema_with_period(conn: Any) -> None:
+    """Create test database schema including period column in etl_events."""
+    run_script(conn, _SCHEMA_DDL)
 
 
 def _seed_minimal_success_data(conn: Any) -> None:
     """Seed minimal data for successful reconciliation."""
-    # Cash account
-    conn.execute(
-        text("""
-        INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-            (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-            (2, 'Expenses:Other', 'Other', 'expense', 0)
-    """)
+    # Bound-parameter executemany: one prepared statement per table
+    db = conn.connection.driver_connection
+    db.executemany(
+        "INSERT INTO accounts (id, code, name, type, is_cash) VALUES (?, ?, ?, ?, ?)",
+        [
+            (1, "Assets:Bank:Checking", "Checking", "asset", 1),
+            (2, "Expenses:Other", "Other", "expense", 0),
+        ],
     )
-
-    # Plaid account
-    conn.execute(
-        text("""
-        INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-        VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-    """)
+    db.execute(
+        "INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency) "
+        "VALUES (?, ?, ?, ?, ?)",
+        ("plaid_checking", "Checking", "depository", "checking", "USD"),
     )
-
-    # Account mapping
-    conn.execute(
-        text("""
-        INSERT INTO account_links (plaid_account_id, account_id)
-        VALUES('plaid_checking', 1)
-    """)
+    db.execute(
+        "INSERT INTO account_links (plaid_account_id, account_id) VALUES (?, ?)",
+        ("plaid_checking", 1),
     )
 
     # Balanced entry for 100.00
-    conn.execute(
-        text("""
-        INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                    source_hash, transform_version, item_id)
-        VALUES(1, 'txn-001', '2024-01-15', 'Test', 'USD', 'hash1', 1, 'item_TEST')
-    """)
+    db.execute(
+        "INSERT INTO journal_entries (id, txn_id, txn_date, description, currency, "
+        "source_hash, transform_version, item_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (1, "txn-001", "2024-01-15", "Test", "USD", "hash1", 1, "item_TEST"),
     )
-
-    conn.execute(
-        text("""
-        INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-            (1, 1, 'debit', 100.00),
-            (1, 2, 'credit', 100.00)
-    """)
+    db.executemany(
+        "INSERT INTO journal_lines (entry_id, account_id, side, amount) "
+        "VALUES (?, ?, ?, ?)",
+        [
+            (1, 1, "debit", Decimal("100.00")),
+            (1, 2, "credit", Decimal("100.00")),
+        ],
     )
 
 
-def test_cli_reconcile_writes_etl_event_success(tmp_path: Path) -> None:
-    """Test that CLI writes ETL event on successful reconciliation."""
-    # Create temp database
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
-    # Setup schema and data
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
-        _create_test_schema_with_period(conn)
-        _seed_minimal_success_data(conn)
-
-    # Create balances JSON file
-    balances_json = tmp_path / "balances.json"
-    balances_json.write_text(json.dumps({"plaid_checking": 100.00}))
+class _EventCase(NamedTuple):
+    """One reconcile run whose etl_events row is checked."""
 
-    # Output file for reconciliation
-    out_json = tmp_path / "recon.json"
-
-    # Run CLI command
-    with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
-        patch("dotenv.load_dotenv"),
-    ):
-        import importlib
+    plaid_balance: float
+    period: str
+    reconcile_error: Exception | None
+    expected_exit: int
+    expected_success: bool
 
-        import cli
 
-        importlib.reload(cli)
-        result = runner.invoke(
-            cli.app,
-            [
-                "reconcile",
-                "--item-id",
-                "item_TEST",
-                "--period",
+@pytest.mark.parametrize(
+    "case",
+    [
+        pytest.param(_EventCase(100.00, "2024Q1", None, 0, True), id="success"),
+        # 50.00 variance fails reconciliation but still records diagnostics
+        pytest.param(_EventCase(50.00, "2024Q1", None, 1, False), id="failure"),
+        # Different period to verify the dedicated period column
+        pytest.param(_EventCase(100.00, "2024Q2", None, 0, True), id="period-column"),
+        pytest.param(
+            _EventCase(
+                100.00,
                 "2024Q1",
-                "--balances-json",
-                str(balances_json),
-                "--out",
-                str(out_json),
-            ],
-        )
-
-    # Verify successful exit
-    assert result.exit_code == 0, f"CLI failed: {result.output}"
-    assert out_json.exists(), "recon.json not created"
-
-    # Verify ETL event was written by CLI
-    with engine.begin() as conn:
-        event = conn.execute(
-            text("""
-            SELECT event_type, item_id, period, success, row_counts
-            FROM etl_events
-            WHERE event_type = 'reconcile'
-        """)
-        ).fetchone()
-
-        assert event is not None, "ETL event not written by CLI"
-        assert event[0] == "reconcile"  # event_type
-        assert event[1] == "item_TEST"  # item_id
-        assert event[2] == "2024Q1"  # period column
-        assert bool(event[3]) is True  # success
-        assert event[4] is not None  # row_counts populated
-
-        # Verify row_counts is valid JSON (committed contract)
-        row_counts = json.loads(event[4])
-        assert "period" in row_counts  # Period must be in row_counts per ADR
-        assert row_counts["period"] == "2024Q1"
-
-
-def test_cli_reconcile_writes_etl_event_failure(tmp_path: Path) -> None:
-    """Test that CLI writes ETL event on failed reconciliation with diagnostics."""
-    # Create temp database
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
-    # Setup schema and data
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
-        _create_test_schema_with_period(conn)
-        _seed_minimal_success_data(conn)
-
-    # Create balances JSON with variance that will cause failure
-    balances_json = tmp_path / "balances.json"
-    balances_json.write_text(json.dumps({"plaid_checking": 50.00}))  # 50.00 variance
-
-    # Output file for reconciliation
-    out_json = tmp_path / "recon.json"
-
-    # Run CLI command (should fail)
-    with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
+                RuntimeError("Simulated reconciliation failure"),
+                1,
+                False,
+            ),
+            id="exception",
         ),
-        patch("dotenv.load_dotenv"),
-    ):
-        import importlib
-
-        import cli
-
-        importlib.reload(cli)
-        result = runner.invoke(
-            cli.app,
-            [
-                "reconcile",
-                "--item-id",
-                "item_TEST",
-                "--period",
-                "2024Q1",
-                "--balances-json",
-                str(balances_json),
-                "--out",
-                str(out_json),
-            ],
-        )
-
-    # Verify failure exit code
-    assert result.exit_code == 1, f"CLI should have failed but got: {result.output}"
-    assert out_json.exists(), "recon.json not created on failure"
-
-    # Verify ETL event was written with failure status
-    with engine.begin() as conn:
-        event = conn.execute(
-            text("""
-            SELECT event_type, item_id, period, success, row_counts
-            FROM etl_events
-            WHERE event_type = 'reconcile'
-        """)
-        ).fetchone()
-
-        assert event is not None, "ETL event not written by CLI on failure"
-        assert event[0] == "reconcile"  # event_type
-        assert event[1] == "item_TEST"  # item_id
-        assert event[2] == "2024Q1"  # period column
-        assert bool(event[3]) is False  # success=FALSE on failure
-        assert event[4] is not None  # row_counts with diagnostics
-
-        # Verify row_counts is valid JSON with required keys
-        row_counts = json.loads(event[4])
-        assert "period" in row_counts  # Period must be in row_counts per ADR
-        assert row_counts["period"] == "2024Q1"
-
-
-def test_cli_reconcile_includes_period_column(tmp_path: Path) -> None:
-    """Test that CLI writes period to dedicated column, not just JSON."""
-    # Create temp database
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
+    ],
+)
+def test_cli_reconcile_writes_etl_event(
+    tmp_path: Path, db_conn: Connection, case: _EventCase
+) -> None:
+    """Test that CLI writes an ETL event on success, failure and exception paths."""
     # Setup schema and data
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
-        _create_test_schema_with_period(conn)
-        _seed_minimal_success_data(conn)
+    with db_conn.begin():
+        _create_test_schema_with_period(db_conn)
+        _seed_minimal_success_data(db_conn)
 
     # Create balances JSON file
     balances_json = tmp_path / "balances.json"
-    balances_json.write_text(json.dumps({"plaid_checking": 100.00}))
+    balances_json.write_text(json.dumps({"plaid_checking": case.plaid_balance}))
 
     # Output file for reconciliation
     out_json = tmp_path / "recon.json"
 
-    # Run CLI command
-    with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
-        patch("dotenv.load_dotenv"),
-    ):
+    # Run CLI command, optionally forcing run_reconciliation to raise
+    with patch("dotenv.load_dotenv"):
         import importlib
 
         import cli
 
         importlib.reload(cli)
-        result = runner.invoke(
-            cli.app,
-            [
-                "reconcile",
-                "--item-id",
-                "item_TEST",
-                "--period",
-                "2024Q2",  # Different period to verify
-                "--balances-json",
-                str(balances_json),
-                "--out",
-                str(out_json),
-            ],
-        )
-
-    assert result.exit_code == 0
-
-    # Verify period written to dedicated column for operator queries
-    with engine.begin() as conn:
-        period_from_column = conn.execute(
-            text("SELECT period FROM etl_events WHERE event_type = 'reconcile'")
-        ).scalar()
-
-        assert period_from_column == "2024Q2", "Period not written to dedicated column"
-
-        # Also verify it's in row_counts for completeness
-        row_counts_json = conn.execute(
-            text("SELECT row_counts FROM etl_events WHERE event_type = 'reconcile'")
-        ).scalar()
-
-        row_counts = json.loads(row_counts_json or "{}")
-        assert row_counts["period"] == "2024Q2", "Period not in row_counts JSON"
+        # Patch after reload so it applies to the reloaded module
+        with (
+            patch("cli.run_reconciliation", side_effect=case.reconcile_error)
+            if case.reconcile_error is not None
+            else nullcontext()
+        ):
+            result = runner.invoke(
+                cli.app,
+                [
+                    "reconcile",
+                    "--item-id",
+                    "item_TEST",
+                    "--period",
+                    case.period,
+                    "--balances-json",
+                    str(balances_json),
+                    "--out",
+                    str(out_json),
+                ],
+            )
 
+    assert result.exit_code == case.expected_exit, f"Unexpected exit: {result.output}"
+    # recon.json is written on success and failure, not when reconciliation raises
+    assert out_json.exists() is (case.reconcile_error is None)
 
-def test_cli_reconcile_coverage_failure_records_event(tmp_path: Path) -> None:
+    # Verify ETL event was written by CLI
+    # Same connection as setup; plain sqlite3 read via the driver connection
+    # One query returns the latest reconcile event plus the reconcile event count
+    event = db_conn.connection.driver_connection.execute(
+        "SELECT event_type, item_id, period, success, row_counts, "
+        "(SELECT COUNT(*) FROM etl_events WHERE event_type = 'reconcile'), "
+        "json_extract(row_counts, '$.period') "
+        "FROM etl_events WHERE event_type = 'reconcile' "
+        "ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+
+    assert event is not None, "ETL event not written by CLI"
+    assert event[5] == 1, "Exactly one reconcile event expected per CLI run"
+    assert event[0] == "reconcile"  # event_type
+    assert event[1] == "item_TEST"  # item_id
+    assert event[2] == case.period, "Period not written to dedicated column"
+    assert bool(event[3]) is case.expected_success  # success
+    assert event[4] is not None  # row_counts populated
+
+    # row_counts is JSON (committed contract): SQLite's JSON1 parses it in the
+    # query and raises on malformed JSON
+    assert event[6] == case.period, "Period not in row_counts JSON"
+
+
+def test_cli_reconcile_coverage_failure_records_event(
+    tmp_path: Path, db_conn: Connection
+) -> None:
     """Test that CLI records ETL event even when coverage validation fails."""
-    # Create temp database
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
     # Setup schema and data with mapped cash account missing from balances
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
-        _create_test_schema_with_period(conn)
+    with db_conn.begin():
+        _create_test_schema_with_period(db_conn)
 
         # Create cash + non-cash accounts
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
+        db_conn.execute(_INSERT_CHECKING_AND_OTHER_ACCOUNTS)
 
         # Create plaid accounts
-        conn.execute(
+        db_conn.execute(
             text("""
             INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
             VALUES
@@ -383,13 +341,7 @@ def test_cli_reconcile_coverage_failure_records_event(tmp_path: Path) -> None:
         )
 
         # Map both: cash account becomes required, non-cash ignored for coverage
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id) VALUES
-                ('plaid_checking', 1),
-                ('plaid_credit', 2)
-        """)
-        )
+        db_conn.execute(_LINK_CHECKING_AND_CREDIT)
 
     # balances.json omits the required cash account; includes only extras
     balances_json = tmp_path / "balances.json"
@@ -404,12 +356,7 @@ def test_cli_reconcile_coverage_failure_records_event(tmp_path: Path) -> None:
     out_json = tmp_path / "recon.json"
 
     # Run CLI command (should fail due to coverage)
-    with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
-        patch("dotenv.load_dotenv"),
-    ):
+    with patch("dotenv.load_dotenv"):
         import importlib
 
         import cli
@@ -434,162 +381,58 @@ def test_cli_reconcile_coverage_failure_records_event(tmp_path: Path) -> None:
     assert result.exit_code == 1
 
     # Verify ETL event recorded with coverage failure
-    with engine.begin() as conn:
-        event = conn.execute(
-            text(
-                "SELECT success, row_counts FROM etl_events "
-                "WHERE event_type = 'reconcile'"
-            )
-        ).fetchone()
-
-        assert event is not None, (
-            "ETL event should be recorded even on coverage failure"
-        )
-        assert bool(event[0]) is False  # success=FALSE
+    # Same connection as setup; plain sqlite3 read via the driver connection
+    event = db_conn.connection.driver_connection.execute(
+        "SELECT success, row_counts FROM etl_events WHERE event_type = 'reconcile'"
+    ).fetchone()
 
-        # Validate coverage failure details
-        diag = json.loads(event[1])
-        assert diag["checks"]["coverage"]["passed"] is False
-        assert "missing" in diag["checks"]["coverage"]
-        assert "plaid_checking" in diag["checks"]["coverage"]["missing"]
+    assert event is not None, "ETL event should be recorded even on coverage failure"
+    assert bool(event[0]) is False  # success=FALSE
 
-        # Verify row_counts is valid JSON (minimal check)
-        row_counts = json.loads(event[1])
-        assert isinstance(row_counts, dict)  # Just verify it's structured data
+    # row_counts is structured JSON; parse once and check coverage details
+    diag = json.loads(event[1])
+    assert isinstance(diag, dict)
+    assert diag["checks"]["coverage"]["passed"] is False
+    assert "missing" in diag["checks"]["coverage"]
+    assert "plaid_checking" in diag["checks"]["coverage"]["missing"]
 
 
-def test_cli_reconcile_exception_path_records_event(tmp_path: Path) -> None:
-    """Test that CLI records ETL event even when run_reconciliation raises exception."""
-    # Create temp database
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
-    # Setup schema and data
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
-        _create_test_schema_with_period(conn)
-        _seed_minimal_success_data(conn)
-
-    # Create balances JSON file
-    balances_json = tmp_path / "balances.json"
-    balances_json.write_text(json.dumps({"plaid_checking": 100.00}))
-
-    # Output file for reconciliation
-    out_json = tmp_path / "recon.json"
-
-    # Run CLI command with environment and mocked reconciliation
-    with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
-        patch("dotenv.load_dotenv"),
-    ):
-        import importlib
-
-        import cli
-
-        importlib.reload(cli)
-        # Patch after reload so it applies to the reloaded module
-        with patch("cli.run_reconciliation") as mock_reconcile:
-            mock_reconcile.side_effect = RuntimeError(
-                "Simulated reconciliation failure"
-            )
-            result = runner.invoke(
-                cli.app,
-                [
-                    "reconcile",
-                    "--item-id",
-                    "item_TEST",
-                    "--period",
-                    "2024Q1",
-                    "--balances-json",
-                    str(balances_json),
-                    "--out",
-                    str(out_json),
-                ],
-            )
-
-    # Should fail due to exception
-    assert result.exit_code == 1
-
-    # Verify ETL event was still recorded with failure status
-    with engine.begin() as conn:
-        event = conn.execute(
-            text("""
-            SELECT event_type, item_id, period, success, row_counts
-            FROM etl_events
-            WHERE event_type = 'reconcile'
-        """)
-        ).fetchone()
-
-        assert event is not None, "ETL event should be recorded even on exception"
-        assert event[0] == "reconcile"  # event_type
-        assert event[1] == "item_TEST"  # item_id
-        assert event[2] == "2024Q1"  # period column
-        assert bool(event[3]) is False  # success=FALSE on exception
-        assert event[4] is not None  # row_counts populated
-
-        # Verify row_counts contains period
-        row_counts = json.loads(event[4])
-        assert "period" in row_counts
-        assert row_counts["period"] == "2024Q1"
-
-
-def test_reconcile_requires_balance_source_none(tmp_path: Path) -> None:
+def test_reconcile_requires_balance_source_none(
+    tmp_path: Path, db_engine: Engine, capsys: pytest.CaptureFixture[str]
+) -> None:
     """Test CLI fails when neither --balances-json nor --use-plaid-live specified."""
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
     # Setup minimal schema
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
+    with db_engine.begin() as conn:
         _create_test_schema_with_period(conn)
 
     # Output file
     out_json = tmp_path / "recon.json"
 
-    # Run CLI command with neither data source specified
-    with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
-        patch("dotenv.load_dotenv"),
-    ):
+    # Call the command directly with neither data source specified; argv
+    # parsing for reconcile is covered by the runner.invoke tests
+    with patch("dotenv.load_dotenv"):
         import importlib
 
         import cli
 
         importlib.reload(cli)
-        result = runner.invoke(
-            cli.app,
-            [
-                "reconcile",
-                "--item-id",
-                "item_TEST",
-                "--period",
-                "2024Q1",
-                "--out",
-                str(out_json),
-                # Neither --balances-json nor --use-plaid-live
-            ],
-        )
+        with pytest.raises(typer.Exit) as exc_info:
+            cli.reconcile(item_id="item_TEST", period="2024Q1", out=str(out_json))
 
     # Should fail with exit code 2 (invalid usage)
-    assert result.exit_code == 2
-    # Confirm we're in the usage error path (Typer automatically includes this)
-    assert "Usage: pfetl reconcile" in result.output
-    # Check output for usage error (more flexible substring matching)
-    assert "Provide exactly one of --balances-json or --use-plaid-live" in result.output
+    assert exc_info.value.exit_code == 2
+    err = capsys.readouterr().err
+    # Confirm we're in the usage error path
+    assert "Usage: pfetl reconcile" in err
+    assert "Provide exactly one of --balances-json or --use-plaid-live" in err
 
 
-def test_reconcile_requires_balance_source_both(tmp_path: Path) -> None:
+def test_reconcile_requires_balance_source_both(
+    tmp_path: Path, db_engine: Engine, capsys: pytest.CaptureFixture[str]
+) -> None:
     """Test CLI fails when both --balances-json and --use-plaid-live specified."""
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
     # Setup minimal schema
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
+    with db_engine.begin() as conn:
         _create_test_schema_with_period(conn)
 
     # Create dummy balances file
@@ -599,50 +442,37 @@ def test_reconcile_requires_balance_source_both(tmp_path: Path) -> None:
     # Output file
     out_json = tmp_path / "recon.json"
 
-    # Run CLI command with both data sources specified
-    with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
-        patch("dotenv.load_dotenv"),
-    ):
+    # Call the command directly with both data sources specified
+    with patch("dotenv.load_dotenv"):
         import importlib
 
         import cli
 
         importlib.reload(cli)
-        result = runner.invoke(
-            cli.app,
-            [
-                "reconcile",
-                "--item-id",
-                "item_TEST",
-                "--period",
-                "2024Q1",
-                "--balances-json",
-                str(balances_json),  # First source
-                "--use-plaid-live",  # Second source (conflict)
-                "--out",
-                str(out_json),
-            ],
-        )
+        with pytest.raises(typer.Exit) as exc_info:
+            cli.reconcile(
+                item_id="item_TEST",
+                period="2024Q1",
+                out=str(out_json),
+                balances_json=str(balances_json),  # First source
+                use_plaid_live=True,  # Second source (conflict)
+            )
 
     # Should fail with exit code 2 (invalid usage)
-    assert result.exit_code == 2
-    # Confirm we're in the usage error path (Typer automatically includes this)
-    assert "Usage: pfetl reconcile" in result.output
-    # Check output for usage error (more flexible substring matching)
-    assert "Provide exactly one of --balances-json or --use-plaid-live" in result.output
+    assert exc_info.value.exit_code == 2
+    err = capsys.readouterr().err
+    # Confirm we're in the usage error path
+    assert "Usage: pfetl reconcile" in err
+    assert "Provide exactly one of --balances-json or --use-plaid-live" in err
 
 
-def test_reconcile_live_requires_plaid_creds(tmp_path: Path) -> None:
+def test_reconcile_live_requires_plaid_creds(
+    tmp_path: Path, db_engine: Engine, monkeypatch: pytest.MonkeyPatch
+) -> None:
     """Test CLI fails when --use-plaid-live specified without PLAID_ACCESS_TOKEN."""
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
+    monkeypatch.delenv("PLAID_ACCESS_TOKEN", raising=False)
     # Setup minimal schema
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
+    with db_engine.begin() as conn:
         _create_test_schema_with_period(conn)
 
     # Output file
@@ -650,9 +480,6 @@ def test_reconcile_live_requires_plaid_creds(tmp_path: Path) -> None:
 
     # Run CLI command with --use-plaid-live but no access token
     with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
         patch("dotenv.load_dotenv"),  # belt & suspenders
         patch("etl.extract.fetch_accounts") as mock_fetch,  # patch where cli calls
     ):
@@ -684,44 +511,22 @@ def test_reconcile_live_requires_plaid_creds(tmp_path: Path) -> None:
     assert not out_json.exists()
 
 
-def test_reconcile_balances_json_requires_full_cash_coverage(tmp_path: Path) -> None:
+def test_reconcile_balances_json_requires_full_cash_coverage(
+    tmp_path: Path, db_engine: Engine
+) -> None:
     """Test CLI fails when balances JSON missing mapped cash accounts."""
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
     # Setup schema and data
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
+    with db_engine.begin() as conn:
         _create_test_schema_with_period(conn)
 
         # Create two cash accounts
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Assets:Bank:Savings', 'Savings', 'asset', 1)
-        """)
-        )
+        conn.execute(_INSERT_CHECKING_AND_SAVINGS_ACCOUNTS)
 
         # Create corresponding Plaid accounts
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES
-                ('plaid_checking', 'Checking', 'depository', 'checking', 'USD'),
-                ('plaid_savings', 'Savings', 'depository', 'savings', 'USD')
-        """)
-        )
+        conn.execute(_INSERT_PLAID_CHECKING_AND_SAVINGS)
 
         # Map both to cash accounts
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES
-                ('plaid_checking', 1),
-                ('plaid_savings', 2)
-        """)
-        )
+        conn.execute(_LINK_CHECKING_AND_SAVINGS)
 
     # Create balances JSON with only ONE of the two mapped accounts
     balances_json = tmp_path / "balances.json"
@@ -736,12 +541,7 @@ def test_reconcile_balances_json_requires_full_cash_coverage(tmp_path: Path) ->
     out_json = tmp_path / "recon.json"
 
     # Run CLI command
-    with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
-        patch("dotenv.load_dotenv"),
-    ):
+    with patch("dotenv.load_dotenv"):
         import importlib
 
         import cli
@@ -765,28 +565,21 @@ def test_reconcile_balances_json_requires_full_cash_coverage(tmp_path: Path) ->
     # Should fail due to coverage
     assert result.exit_code == 1
     # Check that message contains missing account ID (flexible to format changes)
-    assert "Missing balance data for accounts" in result.output
-    assert "plaid_savings" in result.output
+    output = result.output
+    assert "Missing balance data for accounts" in output
+    assert "plaid_savings" in output
 
 
-def test_reconcile_balances_json_allows_extras_and_non_cash(tmp_path: Path) -> None:
+def test_reconcile_balances_json_allows_extras_and_non_cash(
+    tmp_path: Path, db_engine: Engine
+) -> None:
     """Test CLI passes when balances JSON has extra accounts and covers mapped cash."""
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
     # Setup schema and data
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
+    with db_engine.begin() as conn:
         _create_test_schema_with_period(conn)
 
         # Create one cash account and one non-cash account
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
+        conn.execute(_INSERT_CHECKING_AND_OTHER_ACCOUNTS)
 
         # Create corresponding Plaid accounts
         conn.execute(
@@ -799,14 +592,7 @@ def test_reconcile_balances_json_allows_extras_and_non_cash(tmp_path: Path) -> N
         )
 
         # Map both accounts (one cash, one non-cash)
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES
-                ('plaid_checking', 1),
-                ('plaid_credit', 2)
-        """)
-        )
+        conn.execute(_LINK_CHECKING_AND_CREDIT)
 
         # Create balanced entry
         conn.execute(
@@ -839,12 +625,7 @@ def test_reconcile_balances_json_allows_extras_and_non_cash(tmp_path: Path) -> N
     out_json = tmp_path / "recon.json"
 
     # Run CLI command
-    with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
-        patch("dotenv.load_dotenv"),  # belt & suspenders
-    ):
+    with patch("dotenv.load_dotenv"):  # belt & suspenders
         import importlib
 
         import cli
@@ -870,14 +651,12 @@ def test_reconcile_balances_json_allows_extras_and_non_cash(tmp_path: Path) -> N
     assert "Reconciliation passed for 2024Q1" in result.output
 
 
-def test_reconcile_balances_json_file_not_found(tmp_path: Path) -> None:
+def test_reconcile_balances_json_file_not_found(
+    tmp_path: Path, db_engine: Engine
+) -> None:
     """Test CLI fails when --balances-json points to nonexistent file."""
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
     # Setup minimal schema
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
+    with db_engine.begin() as conn:
         _create_test_schema_with_period(conn)
 
     # Point to nonexistent file
@@ -885,12 +664,7 @@ def test_reconcile_balances_json_file_not_found(tmp_path: Path) -> None:
     out_json = tmp_path / "recon.json"
 
     # Run CLI command
-    with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
-        patch("dotenv.load_dotenv"),
-    ):
+    with patch("dotenv.load_dotenv"):
         import importlib
 
         import cli
@@ -916,14 +690,12 @@ def test_reconcile_balances_json_file_not_found(tmp_path: Path) -> None:
     assert "Failed to read --balances-json" in result.output
 
 
-def test_reconcile_balances_json_invalid_format(tmp_path: Path) -> None:
+def test_reconcile_balances_json_invalid_format(
+    tmp_path: Path, db_engine: Engine
+) -> None:
     """Test CLI fails when balances JSON has invalid format."""
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
     # Setup minimal schema
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
+    with db_engine.begin() as conn:
         _create_test_schema_with_period(conn)
 
     # Create invalid JSON file (list instead of dict)
@@ -933,12 +705,7 @@ def test_reconcile_balances_json_invalid_format(tmp_path: Path) -> None:
     out_json = tmp_path / "recon.json"
 
     # Run CLI command
-    with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
-        patch("dotenv.load_dotenv"),
-    ):
+    with patch("dotenv.load_dotenv"):
         import importlib
 
         import cli
@@ -964,14 +731,10 @@ def test_reconcile_balances_json_invalid_format(tmp_path: Path) -> None:
     assert "--balances-json must be JSON object" in result.output
 
 
-def test_reconcile_requires_out_parameter(tmp_path: Path) -> None:
+def test_reconcile_requires_out_parameter(tmp_path: Path, db_engine: Engine) -> None:
     """Test CLI fails when --out parameter is omitted."""
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
     # Setup minimal schema
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
+    with db_engine.begin() as conn:
         _create_test_schema_with_period(conn)
 
     # Create balances file
@@ -979,12 +742,7 @@ def test_reconcile_requires_out_parameter(tmp_path: Path) -> None:
     balances_json.write_text(json.dumps({"plaid_test": 100.00}))
 
     # Run CLI command without --out parameter
-    with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
-        patch("dotenv.load_dotenv"),
-    ):
+    with patch("dotenv.load_dotenv"):
         import importlib
 
         import cli
@@ -1007,19 +765,16 @@ def test_reconcile_requires_out_parameter(tmp_path: Path) -> None:
     # Should fail with usage error (exit 2)
     assert result.exit_code == 2
     # Confirm we're in the usage error path (more flexible for styled output)
-    assert "pfetl reconcile" in result.output and "Usage:" in result.output
+    output = result.output
+    assert "pfetl reconcile" in output and "Usage:" in output
     # Typer will show missing required option error
-    assert "Missing option" in result.output or "required" in result.output.lower()
+    assert "Missing option" in output or "required" in output.lower()
 
 
-def test_reconcile_no_mapped_cash_accounts(tmp_path: Path) -> None:
+def test_reconcile_no_mapped_cash_accounts(tmp_path: Path, db_engine: Engine) -> None:
     """Test CLI handles case where no mapped cash accounts exist."""
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
     # Setup schema with NO cash accounts mapped
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
+    with db_engine.begin() as conn:
         _create_test_schema_with_period(conn)
 
         # Create only non-cash accounts
@@ -1055,12 +810,7 @@ def test_reconcile_no_mapped_cash_accounts(tmp_path: Path) -> None:
     out_json = tmp_path / "recon.json"
 
     # Run CLI command
-    with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
-        patch("dotenv.load_dotenv"),
-    ):
+    with patch("dotenv.load_dotenv"):
         import importlib
 
         import cli
@@ -1087,74 +837,29 @@ def test_reconcile_no_mapped_cash_accounts(tmp_path: Path) -> None:
 
 
 def test_reconcile_live_mode_missing_balance_for_mapped_cash_fails(
-    tmp_path: Path,
+    tmp_path: Path, db_engine: Engine, monkeypatch: pytest.MonkeyPatch
 ) -> None:
     """Test that --use-plaid-live fails when API omits mapped cash account balances."""
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
     # Setup schema and data
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
+    with db_engine.begin() as conn:
         _create_test_schema_with_period(conn)
 
         # Create two cash accounts
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Assets:Bank:Savings', 'Savings', 'asset', 1)
-        """)
-        )
+        conn.execute(_INSERT_CHECKING_AND_SAVINGS_ACCOUNTS)
 
         # Create corresponding Plaid accounts
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES
-                ('plaid_checking', 'Checking', 'depository', 'checking', 'USD'),
-                ('plaid_savings', 'Savings', 'depository', 'savings', 'USD')
-        """)
-        )
+        conn.execute(_INSERT_PLAID_CHECKING_AND_SAVINGS)
 
         # Map both to cash accounts
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES
-                ('plaid_checking', 1),
-                ('plaid_savings', 2)
-        """)
-        )
-
-    # Mock Plaid API to return only ONE of the two mapped accounts
-    def mock_fetch_accounts(_access_token: str) -> list[dict[str, Any]]:
-        return [
-            {
-                "account_id": "plaid_checking",
-                "name": "Checking",
-                "type": "depository",
-                "subtype": "checking",
-                "balances": {"current": 100.00},
-            }
-            # Missing: plaid_savings account
-        ]
+        conn.execute(_LINK_CHECKING_AND_SAVINGS)
 
     out_json = tmp_path / "recon.json"
+    monkeypatch.setenv("PLAID_ACCESS_TOKEN", "fake_token")
 
-    # Run CLI command with --use-plaid-live and mocked API
+    # Run CLI command with --use-plaid-live; the mocked API omits plaid_savings
     with (
-        patch.dict(
-            "os.environ",
-            {
-                "DATABASE_URL": db_url,
-                "PLAID_ACCESS_TOKEN": "fake_token",
-                "PFETL_SKIP_DOTENV": "1",
-            },
-            clear=True,
-        ),
         patch("dotenv.load_dotenv"),  # belt & suspenders
-        patch("etl.extract.fetch_accounts", side_effect=mock_fetch_accounts),
+        patch("etl.extract.fetch_accounts", side_effect=_fetch_checking_only),
     ):
         import importlib
 
@@ -1178,18 +883,15 @@ def test_reconcile_live_mode_missing_balance_for_mapped_cash_fails(
     # Should fail due to missing account in live API response
     assert result.exit_code == 1
     # Check that message contains missing mapped cash account ID
-    assert "Missing balance data for accounts" in result.output
-    assert "plaid_savings" in result.output
+    output = result.output
+    assert "Missing balance data for accounts" in output
+    assert "plaid_savings" in output
 
 
-def test_list_accounts_fails_without_scoping_source(tmp_path: Path) -> None:
+def test_list_accounts_fails_without_scoping_source(db_engine: Engine) -> None:
     """Test list-plaid-accounts fails when no scoping source available."""
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
     # Setup schema with plaid_accounts but NO ingest_accounts data
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
+    with db_engine.begin() as conn:
         _create_test_schema_with_period(conn)
 
         # Add some plaid_accounts (but not linked to any item_id via ingest_accounts)
@@ -1201,18 +903,10 @@ def test_list_accounts_fails_without_scoping_source(tmp_path: Path) -> None:
         )
         # ingest_accounts table is empty - no item_id scoping available
 
-    # Mock API to fail (simulating no PLAID_ACCESS_TOKEN or API error)
-    def mock_fetch_accounts_fail(_access_token: str) -> list[dict[str, Any]]:
-        msg = "API unavailable"
-        raise RuntimeError(msg)
-
-    # Run CLI command
+    # Run CLI command with the Plaid API failing (no token or API error)
     with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
         patch("dotenv.load_dotenv"),  # belt & suspenders
-        patch("etl.extract.fetch_accounts", side_effect=mock_fetch_accounts_fail),
+        patch("etl.extract.fetch_accounts", side_effect=_fetch_accounts_unavailable),
     ):
         import importlib
 
@@ -1230,73 +924,53 @@ def test_list_accounts_fails_without_scoping_source(tmp_path: Path) -> None:
 
     # Should fail with scoping error
     assert result.exit_code == 1
-    assert "Cannot scope by item_id yet" in result.output
-    assert "Ingest this item first" in result.output
+    output = result.output
+    assert "Cannot scope by item_id yet" in output
+    assert "Ingest this item first" in output
 
 
-def test_list_accounts_help_shows_required_item_option() -> None:
+def test_list_accounts_help_shows_required_item_option(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
     """Test that list-plaid-accounts help shows --item-id as required."""
-    with (
-        patch.dict(
-            "os.environ",
-            {"PFETL_SKIP_DOTENV": "1", "DATABASE_URL": "sqlite:///:memory:"},
-            clear=True,
-        ),
-        patch("dotenv.load_dotenv"),
-    ):
+    monkeypatch.setenv("PFETL_SKIP_DOTENV", "1")
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///:memory:")
+
+    with patch("dotenv.load_dotenv"):
         import importlib
 
         import cli
 
         importlib.reload(cli)
+        # One reload serves both invocations of the same app
         result = runner.invoke(cli.app, ["list-plaid-accounts", "--help"])
+        # Only the exit code matters: let unexpected errors raise, not format
+        res_no_item = runner.invoke(
+            cli.app, ["list-plaid-accounts"], catch_exceptions=False
+        )
 
     # Should show help successfully
     assert result.exit_code == 0
     text = result.stdout or result.output
     # Handle ANSI escape codes by stripping them or using more flexible matching
-    import re
-
-    clean_text = re.sub(r"\x1b\[[0-9;]*m", "", text)  # Remove ANSI escape codes
+    clean_text = _ANSI_ESCAPE_RE.sub("", text)
     assert "--item-id" in clean_text and "required" in clean_text
 
     # More robust than exact "[required]" - verify command fails without --item-id
-    with (
-        patch.dict(
-            "os.environ",
-            {"PFETL_SKIP_DOTENV": "1", "DATABASE_URL": "sqlite:///:memory:"},
-            clear=True,
-        ),
-        patch("dotenv.load_dotenv"),
-    ):
-        import importlib
+    assert res_no_item.exit_code != 0
 
-        import cli
 
-        importlib.reload(cli)
-        res_no_item = runner.invoke(cli.app, ["list-plaid-accounts"])
-        assert res_no_item.exit_code != 0
-
-
-def test_cli_respects_skip_dotenv_env(tmp_path: Path) -> None:
+@pytest.mark.usefixtures("db_url")
+def test_cli_respects_skip_dotenv_env() -> None:
     """Test CLI respects PFETL_SKIP_DOTENV=1 and doesn't load .env file."""
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
-    with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
-        patch("dotenv.load_dotenv") as mock_load_dotenv,
-    ):
+    with patch("dotenv.load_dotenv") as mock_load_dotenv:
         import importlib
 
         import cli  # import here so env & patch apply
 
         importlib.reload(cli)
-        result = runner.invoke(
-            cli.app, ["--help"]
-        )  # triggers app callback, no DB side effects
+        # Triggers app callback, no DB side effects; exit code only
+        result = runner.invoke(cli.app, ["--help"], catch_exceptions=False)
 
     # Should succeed without loading .env
     assert result.exit_code == 0
@@ -1304,22 +978,18 @@ def test_cli_respects_skip_dotenv_env(tmp_path: Path) -> None:
     mock_load_dotenv.assert_not_called()
 
 
-def test_live_mode_without_token_never_calls_fetch(tmp_path: Path) -> None:
+def test_live_mode_without_token_never_calls_fetch(
+    tmp_path: Path, db_engine: Engine, monkeypatch: pytest.MonkeyPatch
+) -> None:
     """Test --use-plaid-live without token fails fast and never calls fetch_accounts."""
-    db_file = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_file}"
-
+    monkeypatch.delenv("PLAID_ACCESS_TOKEN", raising=False)
     # Setup minimal schema
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
+    with db_engine.begin() as conn:
         _create_test_schema_with_period(conn)
 
     out_json = tmp_path / "recon.json"
 
     with (
-        patch.dict(
-            "os.environ", {"DATABASE_URL": db_url, "PFETL_SKIP_DOTENV": "1"}, clear=True
-        ),
         patch("dotenv.load_dotenv"),
         patch("etl.extract.fetch_accounts") as mock_fetch,  # patch where cli calls
     ):
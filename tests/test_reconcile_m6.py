@@ -2,451 +2,466 @@
 
 from __future__ import annotations
 
-import json
-from typing import TYPE_CHECKING, Any
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, NamedTuple
+from uuid import uuid4
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
     from pathlib import Path
 
+    from sqlalchemy.engine import Connection, Engine
+
 import pytest
-from cli import app
+import typer
+from cli import reconcile
 from sqlalchemy import create_engine, text
-from typer.testing import CliRunner
 
 from etl.reconcile import run_reconciliation
-
-runner = CliRunner()
-
-
-def _create_test_schema(conn: Any) -> None:
-    """Create test database schema with item_id support."""
+from tests.conftest import INS_ACCOUNT, INS_LINE, INS_LINK, INS_PLAID, run_script
+
+_SCHEMA_SQL = """
+CREATE TABLE accounts (
+    id INTEGER PRIMARY KEY,
+    code TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    is_cash BOOLEAN NOT NULL DEFAULT 0
+);
+CREATE TABLE journal_entries (
+    id INTEGER PRIMARY KEY,
+    txn_id TEXT UNIQUE NOT NULL,
+    txn_date DATE NOT NULL,
+    description TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    transform_version INTEGER NOT NULL,
+    item_id TEXT  -- NEW: item scoping
+);
+CREATE TABLE journal_lines (
+    id INTEGER PRIMARY KEY,
+    entry_id INTEGER NOT NULL REFERENCES journal_entries(id),
+    account_id INTEGER NOT NULL REFERENCES accounts(id),
+    side TEXT NOT NULL CHECK (side IN ('debit','credit')),
+    amount NUMERIC(18,2) NOT NULL CHECK (amount >= 0)
+);
+CREATE TABLE plaid_accounts (
+    plaid_account_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    subtype TEXT NOT NULL,
+    currency TEXT NOT NULL
+);
+CREATE TABLE account_links (
+    id INTEGER PRIMARY KEY,
+    plaid_account_id TEXT UNIQUE NOT NULL,
+    account_id INTEGER NOT NULL REFERENCES accounts(id)
+);
+CREATE TABLE etl_events (
+    id INTEGER PRIMARY KEY,
+    event_type TEXT NOT NULL,
+    item_id TEXT,
+    period TEXT,
+    row_counts TEXT,
+    started_at TEXT,
+    finished_at TEXT,
+    success BOOLEAN NOT NULL
+);
+"""
+
+
+class _Seed(NamedTuple):
+    """Chart of accounts plus Plaid mappings shared by several tests."""
+
+    accounts: list[tuple[int, str, str, str, int]]
+    plaid_accounts: list[tuple[str, str, str, str, str]]
+    links: list[tuple[str, int]]
+
+
+# Checking (cash, mapped) plus an unmapped expense offset account
+_ONE_CASH_ACCOUNT = _Seed(
+    accounts=[
+        (1, "Assets:Bank:Checking", "Checking", "asset", 1),
+        (2, "Expenses:Other", "Other", "expense", 0),
+    ],
+    plaid_accounts=[("plaid_checking", "Checking", "depository", "checking", "USD")],
+    links=[("plaid_checking", 1)],
+)
+
+# Checking and Savings (both cash, both mapped) plus an expense offset account
+_TWO_CASH_ACCOUNTS = _Seed(
+    accounts=[
+        (1, "Assets:Bank:Checking", "Checking", "asset", 1),
+        (2, "Assets:Bank:Savings", "Savings", "asset", 1),
+        (3, "Expenses:Other", "Other", "expense", 0),
+    ],
+    plaid_accounts=[
+        ("plaid_checking", "Checking", "depository", "checking", "USD"),
+        ("plaid_savings", "Savings", "depository", "savings", "USD"),
+    ],
+    links=[("plaid_checking", 1), ("plaid_savings", 2)],
+)
+
+
+@pytest.fixture(scope="module")
+def schema_engine() -> Iterator[Engine]:
+    """One in-memory engine per module with the schema created once."""
+    eng = create_engine("sqlite://")
+    with eng.begin() as conn:
+        run_script(conn, _SCHEMA_SQL)
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture
+def conn(schema_engine: Engine) -> Iterator[Connection]:
+    """Connection inside a transaction that is rolled back after the test.
+
+    Seeds and reconciliation reads share it, so every test starts from the
+    empty schema without re-running any DDL.
+    """
+    with schema_engine.connect() as connection:
+        transaction = connection.begin()
+        yield connection
+        transaction.rollback()
+
+
+@pytest.fixture
+def shared_engine(monkeypatch: pytest.MonkeyPatch) -> Iterator[Engine]:
+    """In-memory memdb database that the CLI reaches via DATABASE_URL.
+
+    The fixture holds a connection open for the whole test; the database is
+    dropped once the last connection closes. Durability PRAGMAs come from the
+    conftest connect hook.
+    """
+    # vfs=memdb rather than mode=memory: the CLI's create_engine() then picks
+    # QueuePool without SQLAlchemy's mode=memory pool-selection deprecation
+    url = f"sqlite:///file:/m6_{uuid4().hex}?vfs=memdb&uri=true"
+    monkeypatch.setenv("DATABASE_URL", url)
+    monkeypatch.setenv("PFETL_SKIP_DOTENV", "1")
+    eng = create_engine(url)
+    with eng.connect():
+        yield eng
+    eng.dispose()
+
+
+# Balances file for the CLI coverage test: plaid_savings deliberately missing
+_BALANCES_MISSING_SAVINGS = b'{"plaid_checking": 100.0}'
+
+# Entry insert pins currency and transform_version; the rest come from conftest
+_INS_ENTRY = text(
+    "INSERT INTO journal_entries (id, txn_id, txn_date, description, "
+    "currency, source_hash, transform_version, item_id) "
+    "VALUES (:id, :txn_id, :txn_date, :description, 'USD', :source_hash, 1, "
+    ":item_id)"
+)
+
+
+def _seed_accounts(conn: Any, rows: list[tuple[int, str, str, str, int]]) -> None:
+    """Insert (id, code, name, type, is_cash) rows in one executemany."""
     conn.execute(
-        text("""
-        CREATE TABLE accounts (
-            id INTEGER PRIMARY KEY,
-            code TEXT UNIQUE NOT NULL,
-            name TEXT NOT NULL,
-            type TEXT NOT NULL,
-            is_cash BOOLEAN NOT NULL DEFAULT 0
-        )
-    """)
+        INS_ACCOUNT,
+        [
+            {"id": id_, "code": code, "name": name, "type": type_, "is_cash": is_cash}
+            for id_, code, name, type_, is_cash in rows
+        ],
     )
 
-    conn.execute(
-        text("""
-        CREATE TABLE journal_entries (
-            id INTEGER PRIMARY KEY,
-            txn_id TEXT UNIQUE NOT NULL,
-            txn_date DATE NOT NULL,
-            description TEXT NOT NULL,
-            currency TEXT NOT NULL,
-            source_hash TEXT NOT NULL,
-            transform_version INTEGER NOT NULL,
-            item_id TEXT  -- NEW: item scoping
-        )
-    """)
-    )
 
+def _seed_plaid_accounts(conn: Any, rows: list[tuple[str, str, str, str, str]]) -> None:
+    """Insert (plaid_account_id, name, type, subtype, currency) rows."""
     conn.execute(
-        text("""
-        CREATE TABLE journal_lines (
-            id INTEGER PRIMARY KEY,
-            entry_id INTEGER NOT NULL REFERENCES journal_entries(id),
-            account_id INTEGER NOT NULL REFERENCES accounts(id),
-            side TEXT NOT NULL CHECK (side IN ('debit','credit')),
-            amount NUMERIC(18,2) NOT NULL CHECK (amount >= 0)
-        )
-    """)
+        INS_PLAID,
+        [
+            {
+                "plaid_account_id": plaid_id,
+                "name": name,
+                "type": type_,
+                "subtype": subtype,
+                "currency": currency,
+            }
+            for plaid_id, name, type_, subtype, currency in rows
+        ],
     )
 
+
+def _seed_links(conn: Any, rows: list[tuple[str, int]]) -> None:
+    """Insert (plaid_account_id, account_id) mappings."""
     conn.execute(
-        text("""
-        CREATE TABLE plaid_accounts (
-            plaid_account_id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            type TEXT NOT NULL,
-            subtype TEXT NOT NULL,
-            currency TEXT NOT NULL
-        )
-    """)
+        INS_LINK,
+        [
+            {"plaid_account_id": plaid_id, "account_id": account_id}
+            for plaid_id, account_id in rows
+        ],
     )
 
+
+def _seed_chart(conn: Any, seed: _Seed) -> None:
+    """Insert a shared chart of accounts with its Plaid accounts and links."""
+    _seed_accounts(conn, seed.accounts)
+    _seed_plaid_accounts(conn, seed.plaid_accounts)
+    _seed_links(conn, seed.links)
+
+
+def _seed_entries(conn: Any, rows: list[tuple[int, str, str, str, str]]) -> None:
+    """Insert (id, txn_id, txn_date, description, item_id) USD entries.
+
+    source_hash is derived from the id ("hash<id>") and transform_version is 1.
+    """
     conn.execute(
-        text("""
-        CREATE TABLE account_links (
-            id INTEGER PRIMARY KEY,
-            plaid_account_id TEXT UNIQUE NOT NULL,
-            account_id INTEGER NOT NULL REFERENCES accounts(id)
-        )
-    """)
+        _INS_ENTRY,
+        [
+            {
+                "id": id_,
+                "txn_id": txn_id,
+                "txn_date": txn_date,
+                "description": description,
+                "source_hash": f"hash{id_}",
+                "item_id": item_id,
+            }
+            for id_, txn_id, txn_date, description, item_id in rows
+        ],
     )
 
+
+def _seed_lines(conn: Any, rows: list[tuple[int, int, str, Decimal]]) -> None:
+    """Insert (entry_id, account_id, side, amount) journal lines."""
     conn.execute(
-        text("""
-        CREATE TABLE etl_events (
-            id INTEGER PRIMARY KEY,
-            event_type TEXT NOT NULL,
-            item_id TEXT,
-            period TEXT,
-            row_counts TEXT,
-            started_at TEXT,
-            finished_at TEXT,
-            success BOOLEAN NOT NULL
-        )
-    """)
+        INS_LINE,
+        [
+            {
+                "entry_id": entry_id,
+                "account_id": account_id,
+                "side": side,
+                "amount": amt,
+            }
+            for entry_id, account_id, side, amt in rows
+        ],
     )
 
 
-def test_reconcile_coverage_rule_missing_account() -> None:
+def test_reconcile_coverage_rule_missing_account(conn: Connection) -> None:
     """Test that reconciliation fails when a mapped cash account is missing."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Seed TWO cash accounts, both mapped
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Assets:Bank:Savings', 'Savings', 'asset', 1),
-                (3, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
+    # Seed TWO cash accounts, both mapped
+    _seed_chart(conn, _TWO_CASH_ACCOUNTS)
 
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES
-                ('plaid_checking', 'Checking', 'depository', 'checking', 'USD'),
-                ('plaid_savings', 'Savings', 'depository', 'savings', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES
-                ('plaid_checking', 1),
-                ('plaid_savings', 2)
-        """)
-        )
-
-        # Create balanced entries for both accounts
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES
-                (
-                    1, 'txn-001', '2024-03-15', 'Checking deposit', 'USD',
-                    'hash1', 1, 'item_A'
-                ),
-                (
-                    2, 'txn-002', '2024-03-20', 'Savings deposit', 'USD',
-                    'hash2', 1, 'item_A'
-                )
-        """)
-        )
+    # Create balanced entries for both accounts
+    _seed_entries(
+        conn,
+        [
+            (1, "txn-001", "2024-03-15", "Checking deposit", "item_A"),
+            (2, "txn-002", "2024-03-20", "Savings deposit", "item_A"),
+        ],
+    )
 
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),
-                (1, 3, 'credit', 100.00),
-                (2, 2, 'debit', 50.00),
-                (2, 3, 'credit', 50.00)
-        """)
-        )
+    _seed_lines(
+        conn,
+        [
+            (1, 1, "debit", Decimal("100.00")),
+            (1, 3, "credit", Decimal("100.00")),
+            (2, 2, "debit", Decimal("50.00")),
+            (2, 3, "credit", Decimal("50.00")),
+        ],
+    )
 
-        # JSON includes only ONE account (missing plaid_savings)
-        plaid_balances = {
-            "plaid_checking": 100.00
-            # plaid_savings is MISSING - should cause failure
-        }
+    # JSON includes only ONE account (missing plaid_savings)
+    plaid_balances = {
+        "plaid_checking": 100.00
+        # plaid_savings is MISSING - should cause failure
+    }
 
-        # This should fail with coverage rule violation
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
+    # This should fail with coverage rule violation
+    result = run_reconciliation(
+        conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
+    )
 
-        assert result["success"] is False
-        assert "checks" in result
-        assert "coverage" in result["checks"]
-        assert result["checks"]["coverage"]["passed"] is False
-        assert "missing" in result["checks"]["coverage"]
-        assert "plaid_savings" in result["checks"]["coverage"]["missing"]
-        assert result["checks"]["coverage"]["extra"] == []  # No extra, only missing
+    assert result["success"] is False
+    assert "checks" in result
+    assert "coverage" in result["checks"]
+    assert result["checks"]["coverage"]["passed"] is False
+    assert "missing" in result["checks"]["coverage"]
+    assert "plaid_savings" in result["checks"]["coverage"]["missing"]
+    assert result["checks"]["coverage"]["extra"] == []  # No extra, only missing
 
 
-def test_reconcile_item_scoped_filtering() -> None:
+def test_reconcile_item_scoped_filtering(conn: Connection) -> None:
     """Test that reconciliation only includes entries for the specified item."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Seed one cash account
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
-
-        # Create entries for BOTH item_A and item_B
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES
-                (
-                    1, 'item-a-001', '2024-02-15', 'Item A transaction',
-                    'USD', 'hash1', 1, 'item_A'
-                ),
-                (
-                    2, 'item-b-001', '2024-02-20', 'Item B transaction',
-                    'USD', 'hash2', 1, 'item_B'
-                )
-        """)
-        )
+    # Seed one cash account
+    _seed_chart(conn, _ONE_CASH_ACCOUNT)
 
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 75.00),   -- Item A: +75 to checking
-                (1, 2, 'credit', 75.00),
-                (2, 1, 'debit', 125.00),  -- Item B: +125 to checking
-                (2, 2, 'credit', 125.00)
-        """)
-        )
+    # Create entries for BOTH item_A and item_B
+    _seed_entries(
+        conn,
+        [
+            (1, "item-a-001", "2024-02-15", "Item A transaction", "item_A"),
+            (2, "item-b-001", "2024-02-20", "Item B transaction", "item_B"),
+        ],
+    )
 
-        # JSON matches only item_A's ending balance (75.00)
-        plaid_balances = {
-            "plaid_checking": 75.00  # Should match item_A only
-        }
+    _seed_lines(
+        conn,
+        [
+            (1, 1, "debit", Decimal("75.00")),  # Item A: +75 to checking
+            (1, 2, "credit", Decimal("75.00")),
+            (2, 1, "debit", Decimal("125.00")),  # Item B: +125 to checking
+            (2, 2, "credit", Decimal("125.00")),
+        ],
+    )
 
-        # Reconcile for item_A only
-        result = run_reconciliation(
-            conn,
-            period="2024Q1",
-            item_id="item_A",  # Should only see 75.00
-            plaid_balances=plaid_balances,
-        )
+    # JSON matches only item_A's ending balance (75.00)
+    plaid_balances = {
+        "plaid_checking": 75.00  # Should match item_A only
+    }
+
+    # Reconcile for item_A only
+    result = run_reconciliation(
+        conn,
+        period="2024Q1",
+        item_id="item_A",  # Should only see 75.00
+        plaid_balances=plaid_balances,
+    )
 
-        # Should pass because GL for item_A = 75.00 matches JSON
-        assert result["success"] is True
-        assert result["checks"]["cash_variance"]["passed"] is True
-        assert result["checks"]["cash_variance"]["total_variance"] == pytest.approx(
-            0.00, abs=1e-2
-        )
-        assert result["checks"]["cash_variance"]["tolerance"] == pytest.approx(
-            0.01, abs=1e-3
-        )
-        assert result["checks"]["coverage"]["passed"] is True
+    # Should pass because GL for item_A = 75.00 matches JSON
+    assert result["success"] is True
+    assert result["checks"]["cash_variance"]["passed"] is True
+    assert result["checks"]["cash_variance"]["total_variance"] == pytest.approx(
+        0.00, abs=1e-2
+    )
+    assert result["checks"]["cash_variance"]["tolerance"] == pytest.approx(
+        0.01, abs=1e-3
+    )
+    assert result["checks"]["coverage"]["passed"] is True
 
 
-def test_reconcile_cash_only_filter() -> None:
+def test_reconcile_cash_only_filter(conn: Connection) -> None:
     """Test that non-cash mapped accounts don't affect cash variance check."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Seed one cash and one non-cash account, BOTH mapped
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),  -- cash
-                (2, 'Assets:Receivables', 'Receivables', 'asset', 0),  -- non-cash
-                (3, 'Revenue:Sales', 'Sales', 'revenue', 0)
-        """)
-        )
+    # Seed one cash and one non-cash account, BOTH mapped
+    _seed_accounts(
+        conn,
+        [
+            (1, "Assets:Bank:Checking", "Checking", "asset", 1),  # cash
+            (2, "Assets:Receivables", "Receivables", "asset", 0),  # non-cash
+            (3, "Revenue:Sales", "Sales", "revenue", 0),
+        ],
+    )
 
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES
-                ('plaid_checking', 'Checking', 'depository', 'checking', 'USD'),
-                ('plaid_receivables', 'Receivables', 'other', 'other', 'USD')
-        """)
-        )
+    _seed_plaid_accounts(
+        conn,
+        [
+            ("plaid_checking", "Checking", "depository", "checking", "USD"),
+            ("plaid_receivables", "Receivables", "other", "other", "USD"),
+        ],
+    )
 
-        # Map BOTH accounts
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES
-                ('plaid_checking', 1),
-                ('plaid_receivables', 2)
-        """)
-        )
+    # Map BOTH accounts
+    _seed_links(
+        conn,
+        [
+            ("plaid_checking", 1),
+            ("plaid_receivables", 2),
+        ],
+    )
 
-        # Create entries affecting both accounts
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES
-                (
-                    1, 'cash-001', '2024-03-10', 'Cash receipt', 'USD',
-                    'hash1', 1, 'item_A'
-                ),
-                (
-                    2, 'ar-001', '2024-03-15', 'AR booking', 'USD',
-                    'hash2', 1, 'item_A'
-                )
-        """)
-        )
+    # Create entries affecting both accounts
+    _seed_entries(
+        conn,
+        [
+            (1, "cash-001", "2024-03-10", "Cash receipt", "item_A"),
+            (2, "ar-001", "2024-03-15", "AR booking", "item_A"),
+        ],
+    )
 
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 200.00),   -- Cash: +200
-                (1, 3, 'credit', 200.00),
-                (2, 2, 'debit', 500.00),   -- Receivables: +500
-                (2, 3, 'credit', 500.00)
-        """)
-        )
+    _seed_lines(
+        conn,
+        [
+            (1, 1, "debit", Decimal("200.00")),  # Cash: +200
+            (1, 3, "credit", Decimal("200.00")),
+            (2, 2, "debit", Decimal("500.00")),  # Receivables: +500
+            (2, 3, "credit", Decimal("500.00")),
+        ],
+    )
 
-        # JSON includes ONLY the cash account (no receivables)
-        plaid_balances = {
-            "plaid_checking": 200.00  # Matches cash GL
-            # plaid_receivables is missing but shouldn't matter (non-cash)
-        }
+    # JSON includes ONLY the cash account (no receivables)
+    plaid_balances = {
+        "plaid_checking": 200.00  # Matches cash GL
+        # plaid_receivables is missing but shouldn't matter (non-cash)
+    }
 
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
+    result = run_reconciliation(
+        conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
+    )
 
-        # Should pass - non-cash account not required in balances
-        assert result["success"] is True
-        assert result["checks"]["cash_variance"]["passed"] is True
-        assert result["checks"]["cash_variance"]["total_variance"] == pytest.approx(
-            0.00, abs=1e-2
-        )
-        assert result["checks"]["coverage"]["passed"] is True
+    # Should pass - non-cash account not required in balances
+    assert result["success"] is True
+    assert result["checks"]["cash_variance"]["passed"] is True
+    assert result["checks"]["cash_variance"]["total_variance"] == pytest.approx(
+        0.00, abs=1e-2
+    )
+    assert result["checks"]["coverage"]["passed"] is True
 
 
-def test_reconcile_by_account_breakdown() -> None:
+def test_reconcile_by_account_breakdown(conn: Connection) -> None:
     """Test that recon.json includes by_account breakdown with individual variances."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Seed two cash accounts
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Assets:Bank:Savings', 'Savings', 'asset', 1),
-                (3, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES
-                ('plaid_checking', 'Checking', 'depository', 'checking', 'USD'),
-                ('plaid_savings', 'Savings', 'depository', 'savings', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES
-                ('plaid_checking', 1),
-                ('plaid_savings', 2)
-        """)
-        )
-
-        # Create entries with different amounts for each account
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES
-                (
-                    1, 'check-001', '2024-03-01', 'Checking activity',
-                    'USD', 'hash1', 1, 'item_A'
-                ),
-                (
-                    2, 'save-001', '2024-03-02', 'Savings activity',
-                    'USD', 'hash2', 1, 'item_A'
-                )
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 150.00),
-                (1, 3, 'credit', 150.00),
-                (2, 2, 'debit', 250.00),
-                (2, 3, 'credit', 250.00)
-        """)
-        )
-
-        # Exact matches for successful reconciliation
-        plaid_balances = {"plaid_checking": 150.00, "plaid_savings": 250.00}
+    # Seed two cash accounts
+    _seed_chart(conn, _TWO_CASH_ACCOUNTS)
 
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
-
-        # Should have by_account breakdown
-        assert "by_account" in result
-        by_account = result["by_account"]
-        assert len(by_account) == 2
+    # Create entries with different amounts for each account
+    _seed_entries(
+        conn,
+        [
+            (1, "check-001", "2024-03-01", "Checking activity", "item_A"),
+            (2, "save-001", "2024-03-02", "Savings activity", "item_A"),
+        ],
+    )
 
-        # Check structure of each account entry
-        for account_detail in by_account:
-            assert "plaid_account_id" in account_detail
-            assert "gl_asof" in account_detail
-            assert "ext_asof" in account_detail
-            assert "variance" in account_detail
+    _seed_lines(
+        conn,
+        [
+            (1, 1, "debit", Decimal("150.00")),
+            (1, 3, "credit", Decimal("150.00")),
+            (2, 2, "debit", Decimal("250.00")),
+            (2, 3, "credit", Decimal("250.00")),
+        ],
+    )
 
-        # Verify specific values
-        checking = next(
-            a for a in by_account if a["plaid_account_id"] == "plaid_checking"
-        )
-        assert checking["gl_asof"] == pytest.approx(150.00, abs=1e-2)
-        assert checking["ext_asof"] == pytest.approx(150.00, abs=1e-2)
-        assert checking["variance"] == pytest.approx(0.00, abs=1e-2)
+    # Exact matches for successful reconciliation
+    plaid_balances = {"plaid_checking": 150.00, "plaid_savings": 250.00}
 
-        savings = next(
-            a for a in by_account if a["plaid_account_id"] == "plaid_savings"
-        )
-        assert savings["gl_asof"] == pytest.approx(250.00, abs=1e-2)
-        assert savings["ext_asof"] == pytest.approx(250.00, abs=1e-2)
-        assert savings["variance"] == pytest.approx(0.00, abs=1e-2)
+    result = run_reconciliation(
+        conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
+    )
 
-        # Should also have total_variance and tolerance in cash_variance check
-        assert result["checks"]["cash_variance"]["total_variance"] == pytest.approx(
-            0.00, abs=1e-2
-        )
-        assert result["checks"]["cash_variance"]["tolerance"] == pytest.approx(
-            0.01, abs=1e-3
-        )
-        assert result["total_variance"] == pytest.approx(0.00, abs=1e-2)
+    # Should have by_account breakdown
+    assert "by_account" in result
+    by_account = result["by_account"]
+    assert len(by_account) == 2
+
+    # Check structure of each account entry
+    for account_detail in by_account:
+        assert "plaid_account_id" in account_detail
+        assert "gl_asof" in account_detail
+        assert "ext_asof" in account_detail
+        assert "variance" in account_detail
+
+    # Verify specific values
+    checking = next(a for a in by_account if a["plaid_account_id"] == "plaid_checking")
+    assert abs(checking["gl_asof"] - 150.00) < 1e-2
+    assert abs(checking["ext_asof"] - 150.00) < 1e-2
+    assert abs(checking["variance"]) < 1e-2
+
+    savings = next(a for a in by_account if a["plaid_account_id"] == "plaid_savings")
+    assert abs(savings["gl_asof"] - 250.00) < 1e-2
+    assert abs(savings["ext_asof"] - 250.00) < 1e-2
+    assert abs(savings["variance"]) < 1e-2
+
+    # Should also have total_variance and tolerance in cash_variance check
+    assert result["checks"]["cash_variance"]["total_variance"] == pytest.approx(
+        0.00, abs=1e-2
+    )
+    assert result["checks"]["cash_variance"]["tolerance"] == pytest.approx(
+        0.01, abs=1e-3
+    )
+    assert result["total_variance"] == pytest.approx(0.00, abs=1e-2)
 
 
 # NOTE: test_reconcile_etl_event_written removed per ADR v1.3.0
@@ -454,455 +469,284 @@ def test_reconcile_by_account_breakdown() -> None:
 # ETL event writing is CLI responsibility - see tests/test_reconcile_cli.py
 
 
-def test_reconcile_asof_ending_balance_cumulative() -> None:
+def test_reconcile_asof_ending_balance_cumulative(conn: Connection) -> None:
     """Test AS-OF methodology uses cumulative balance up to period end."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup account structure
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Revenue:Sales', 'Sales', 'revenue', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
+    # Setup account structure
+    _seed_accounts(
+        conn,
+        [
+            (1, "Assets:Bank:Checking", "Checking", "asset", 1),
+            (2, "Revenue:Sales", "Sales", "revenue", 0),
+        ],
+    )
 
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
+    _seed_plaid_accounts(
+        conn,
+        [
+            ("plaid_checking", "Checking", "depository", "checking", "USD"),
+        ],
+    )
 
-        # Create 3 transactions across Q1: Jan +50, Feb +30, Mar +20 = 100 cumulative
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES
-                (
-                    1, 'jan-001', '2024-01-15', 'January deposit', 'USD',
-                    'hash1', 1, 'item_A'
-                ),
-                (
-                    2, 'feb-001', '2024-02-15', 'February deposit', 'USD',
-                    'hash2', 1, 'item_A'
-                ),
-                (
-                    3, 'mar-001', '2024-03-15', 'March deposit', 'USD',
-                    'hash3', 1, 'item_A'
-                ),
-                (
-                    4, 'apr-001', '2024-04-05', 'April deposit', 'USD',
-                    'hash4', 1, 'item_A'
-                )
-        """)
-        )
+    _seed_links(
+        conn,
+        [
+            ("plaid_checking", 1),
+        ],
+    )
 
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 50.00),   -- Jan: +50
-                (1, 2, 'credit', 50.00),
-                (2, 1, 'debit', 30.00),   -- Feb: +30
-                (2, 2, 'credit', 30.00),
-                (3, 1, 'debit', 20.00),   -- Mar: +20
-                (3, 2, 'credit', 20.00),
-                (4, 1, 'debit', 15.00),   -- Apr: +15 (should be excluded from Q1)
-                (4, 2, 'credit', 15.00)
-        """)
-        )
+    # Create 3 transactions across Q1: Jan +50, Feb +30, Mar +20 = 100 cumulative
+    _seed_entries(
+        conn,
+        [
+            (1, "jan-001", "2024-01-15", "January deposit", "item_A"),
+            (2, "feb-001", "2024-02-15", "February deposit", "item_A"),
+            (3, "mar-001", "2024-03-15", "March deposit", "item_A"),
+            (4, "apr-001", "2024-04-05", "April deposit", "item_A"),
+        ],
+    )
 
-        # AS-OF Q1 ending (2024-03-31) should be 100 (not 115)
-        plaid_balances = {
-            "plaid_checking": 100.00  # Cumulative through March
-        }
+    _seed_lines(
+        conn,
+        [
+            (1, 1, "debit", Decimal("50.00")),  # Jan: +50
+            (1, 2, "credit", Decimal("50.00")),
+            (2, 1, "debit", Decimal("30.00")),  # Feb: +30
+            (2, 2, "credit", Decimal("30.00")),
+            (3, 1, "debit", Decimal("20.00")),  # Mar: +20
+            (3, 2, "credit", Decimal("20.00")),
+            # Apr: +15 (should be excluded from Q1)
+            (4, 1, "debit", Decimal("15.00")),
+            (4, 2, "credit", Decimal("15.00")),
+        ],
+    )
 
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
+    # AS-OF Q1 ending (2024-03-31) should be 100 (not 115)
+    plaid_balances = {
+        "plaid_checking": 100.00  # Cumulative through March
+    }
 
-        # Should pass with AS-OF balance of 100
-        assert result["success"] is True
-        assert result["checks"]["cash_variance"]["passed"] is True
-
-        # Verify by_account shows correct AS-OF balance
-        if "by_account" in result:
-            checking = next(
-                (
-                    a
-                    for a in result["by_account"]
-                    if a["plaid_account_id"] == "plaid_checking"
-                ),
-                None,
-            )
-            if checking:
-                assert checking["gl_asof"] == pytest.approx(100.00, abs=1e-2)
-                assert checking["ext_asof"] == pytest.approx(100.00, abs=1e-2)
-
-
-def test_reconcile_cli_with_coverage_error(tmp_path: Path, monkeypatch: Any) -> None:
-    """Test CLI fails with clear error when coverage rule violated."""
-    db_path = tmp_path / "test.db"
-    db_url = f"sqlite:///{db_path}"
+    result = run_reconciliation(
+        conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
+    )
 
-    engine = create_engine(db_url)
-    with engine.begin() as conn:
-        _create_test_schema(conn)
+    # Should pass with AS-OF balance of 100
+    assert result["success"] is True
+    assert result["checks"]["cash_variance"]["passed"] is True
 
-        # Setup two mapped cash accounts
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Assets:Bank:Savings', 'Savings', 'asset', 1),
-                (3, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
+    # Verify by_account shows correct AS-OF balance
+    if "by_account" in result:
+        checking = next(
+            (
+                a
+                for a in result["by_account"]
+                if a["plaid_account_id"] == "plaid_checking"
+            ),
+            None,
         )
+        if checking:
+            assert abs(checking["gl_asof"] - 100.00) < 1e-2
+            assert abs(checking["ext_asof"] - 100.00) < 1e-2
 
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES
-                ('plaid_checking', 'Checking', 'depository', 'checking', 'USD'),
-                ('plaid_savings', 'Savings', 'depository', 'savings', 'USD')
-        """)
-        )
 
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES
-                ('plaid_checking', 1),
-                ('plaid_savings', 2)
-        """)
-        )
+def test_reconcile_cli_with_coverage_error(
+    tmp_path: Path, shared_engine: Engine, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test CLI fails with clear error when coverage rule violated."""
+    with shared_engine.begin() as conn:
+        run_script(conn, _SCHEMA_SQL)
+
+        # Setup two mapped cash accounts
+        _seed_chart(conn, _TWO_CASH_ACCOUNTS)
 
         # Create entries
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES(1, 'txn-001', '2024-03-15', 'Test', 'USD', 'hash1', 1, 'item_CLI')
-        """)
+        _seed_entries(
+            conn,
+            [
+                (1, "txn-001", "2024-03-15", "Test", "item_CLI"),
+            ],
         )
 
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),
-                (1, 3, 'credit', 100.00)
-        """)
+        _seed_lines(
+            conn,
+            [
+                (1, 1, "debit", Decimal("100.00")),
+                (1, 3, "credit", Decimal("100.00")),
+            ],
         )
 
     # Create balances JSON missing one account
     balances_file = tmp_path / "balances.json"
-    balances_file.write_text(
-        json.dumps({
-            "plaid_checking": 100.00
-            # Missing plaid_savings
-        })
-    )
-
-    monkeypatch.setenv("DATABASE_URL", db_url)
+    balances_file.write_bytes(_BALANCES_MISSING_SAVINGS)
 
-    result = runner.invoke(
-        app,
-        [
-            "reconcile",
-            "--item-id",
-            "item_CLI",
-            "--period",
-            "2024Q1",
-            "--balances-json",
-            str(balances_file),
-            "--out",
-            str(tmp_path / "recon.json"),
-        ],
-    )
+    # Call the command function directly: argv parsing is not under test here
+    with pytest.raises(typer.Exit) as exc_info:
+        reconcile(
+            item_id="item_CLI",
+            period="2024Q1",
+            out=str(tmp_path / "recon.json"),
+            balances_json=str(balances_file),
+        )
 
     # Should fail with coverage error
-    assert result.exit_code != 0
-    assert (
-        "missing balance" in result.output.lower()
-        or "coverage" in result.output.lower()
-    )
+    assert exc_info.value.exit_code != 0
+    err = capsys.readouterr().err.lower()
+    assert "missing balance" in err or "coverage" in err
 
 
-def test_reconcile_coverage_rule_extra_account() -> None:
+def test_reconcile_coverage_rule_extra_account(conn: Connection) -> None:
     """Test that reconciliation fails when balances_json has unmapped accounts."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Seed ONE cash account
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
+    # Seed ONE cash account
+    _seed_chart(conn, _ONE_CASH_ACCOUNT)
 
-        # Create entry
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES(1, 'txn-001', '2024-03-15', 'Test', 'USD', 'hash1', 1, 'item_A')
-        """)
-        )
+    # Create entry
+    _seed_entries(
+        conn,
+        [
+            (1, "txn-001", "2024-03-15", "Test", "item_A"),
+        ],
+    )
 
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),
-                (1, 2, 'credit', 100.00)
-        """)
-        )
+    _seed_lines(
+        conn,
+        [
+            (1, 1, "debit", Decimal("100.00")),
+            (1, 2, "credit", Decimal("100.00")),
+        ],
+    )
 
-        # JSON includes extra unmapped account
-        plaid_balances = {
-            "plaid_checking": 100.00,
-            "plaid_unmapped": 50.00,  # EXTRA - not mapped
-        }
+    # JSON includes extra unmapped account
+    plaid_balances = {
+        "plaid_checking": 100.00,
+        "plaid_unmapped": 50.00,  # EXTRA - not mapped
+    }
 
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
+    result = run_reconciliation(
+        conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
+    )
 
-        assert result["success"] is True  # Extras are now ignored per ADR
-        assert result["checks"]["coverage"]["passed"] is True
-        assert "extra" in result["checks"]["coverage"]
-        assert "plaid_unmapped" in result["checks"]["coverage"]["extra"]
-        assert result["checks"]["coverage"]["missing"] == []  # No missing, only extra
+    assert result["success"] is True  # Extras are now ignored per ADR
+    assert result["checks"]["coverage"]["passed"] is True
+    assert "extra" in result["checks"]["coverage"]
+    assert "plaid_unmapped" in result["checks"]["coverage"]["extra"]
+    assert result["checks"]["coverage"]["missing"] == []  # No missing, only extra
 
 
-def test_reconcile_variance_within_tolerance() -> None:
+def test_reconcile_variance_within_tolerance(conn: Connection) -> None:
     """Test that variance within tolerance passes reconciliation."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup account
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
+    # Setup account
+    _seed_chart(conn, _ONE_CASH_ACCOUNT)
 
-        # Create entry for 100.00
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES(1, 'txn-001', '2024-03-15', 'Test', 'USD', 'hash1', 1, 'item_A')
-        """)
-        )
+    # Create entry for 100.00
+    _seed_entries(
+        conn,
+        [
+            (1, "txn-001", "2024-03-15", "Test", "item_A"),
+        ],
+    )
 
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),
-                (1, 2, 'credit', 100.00)
-        """)
-        )
+    _seed_lines(
+        conn,
+        [
+            (1, 1, "debit", Decimal("100.00")),
+            (1, 2, "credit", Decimal("100.00")),
+        ],
+    )
 
-        # Balance with tiny variance (within 0.01 tolerance)
-        plaid_balances = {
-            "plaid_checking": 100.005  # 0.005 variance < 0.01 tolerance
-        }
+    # Balance with tiny variance (within 0.01 tolerance)
+    plaid_balances = {
+        "plaid_checking": 100.005  # 0.005 variance < 0.01 tolerance
+    }
 
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
+    result = run_reconciliation(
+        conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
+    )
 
-        # Should pass due to tolerance
-        assert result["success"] is True
-        assert result["checks"]["cash_variance"]["passed"] is True
-        assert (
-            result["checks"]["cash_variance"]["total_variance"]
-            <= result["checks"]["cash_variance"]["tolerance"] + 1e-9
-        )
-        assert result["checks"]["cash_variance"]["tolerance"] == pytest.approx(
-            0.01, abs=1e-3
-        )
-        assert result["checks"]["coverage"]["passed"] is True
-        assert result["checks"]["coverage"]["missing"] == []
-        assert result["checks"]["coverage"]["extra"] == []
+    # Should pass due to tolerance
+    assert result["success"] is True
+    assert result["checks"]["cash_variance"]["passed"] is True
+    assert (
+        result["checks"]["cash_variance"]["total_variance"]
+        <= result["checks"]["cash_variance"]["tolerance"] + 1e-9
+    )
+    assert result["checks"]["cash_variance"]["tolerance"] == pytest.approx(
+        0.01, abs=1e-3
+    )
+    assert result["checks"]["coverage"]["passed"] is True
+    assert result["checks"]["coverage"]["missing"] == []
+    assert result["checks"]["coverage"]["extra"] == []
 
 
-def test_reconcile_coverage_all_good() -> None:
+def test_reconcile_coverage_all_good(conn: Connection) -> None:
     """Test that coverage passes when JSON keys exactly match mapped cash accounts."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup two cash accounts
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Assets:Bank:Savings', 'Savings', 'asset', 1),
-                (3, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES
-                ('plaid_checking', 'Checking', 'depository', 'checking', 'USD'),
-                ('plaid_savings', 'Savings', 'depository', 'savings', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES
-                ('plaid_checking', 1),
-                ('plaid_savings', 2)
-        """)
-        )
+    # Setup two cash accounts
+    _seed_chart(conn, _TWO_CASH_ACCOUNTS)
 
-        # Create entries
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES
-                (1, 'txn-001', '2024-03-15', 'Test 1', 'USD', 'hash1', 1, 'item_A'),
-                (2, 'txn-002', '2024-03-20', 'Test 2', 'USD', 'hash2', 1, 'item_A')
-        """)
-        )
+    # Create entries
+    _seed_entries(
+        conn,
+        [
+            (1, "txn-001", "2024-03-15", "Test 1", "item_A"),
+            (2, "txn-002", "2024-03-20", "Test 2", "item_A"),
+        ],
+    )
 
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 150.00),
-                (1, 3, 'credit', 150.00),
-                (2, 2, 'debit', 75.00),
-                (2, 3, 'credit', 75.00)
-        """)
-        )
+    _seed_lines(
+        conn,
+        [
+            (1, 1, "debit", Decimal("150.00")),
+            (1, 3, "credit", Decimal("150.00")),
+            (2, 2, "debit", Decimal("75.00")),
+            (2, 3, "credit", Decimal("75.00")),
+        ],
+    )
 
-        # JSON with EXACT match to mapped cash accounts
-        plaid_balances = {"plaid_checking": 150.00, "plaid_savings": 75.00}
+    # JSON with EXACT match to mapped cash accounts
+    plaid_balances = {"plaid_checking": 150.00, "plaid_savings": 75.00}
 
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
+    result = run_reconciliation(
+        conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
+    )
 
-        # Coverage should pass perfectly
-        assert result["checks"]["coverage"]["passed"] is True
-        assert result["checks"]["coverage"]["missing"] == []
-        assert result["checks"]["coverage"]["extra"] == []
-        assert result["success"] is True
+    # Coverage should pass perfectly
+    assert result["checks"]["coverage"]["passed"] is True
+    assert result["checks"]["coverage"]["missing"] == []
+    assert result["checks"]["coverage"]["extra"] == []
+    assert result["success"] is True
 
 
-def test_reconcile_rounding_edge_case() -> None:
+def test_reconcile_rounding_edge_case(conn: Connection) -> None:
     """Test that rounding edge cases work correctly (100.004 rounds to 100.00)."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup account
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
+    # Setup account
+    _seed_chart(conn, _ONE_CASH_ACCOUNT)
 
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
-
-        # Create entry for exactly 100.00
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES(1, 'txn-001', '2024-03-15', 'Test', 'USD', 'hash1', 1, 'item_A')
-        """)
-        )
+    # Create entry for exactly 100.00
+    _seed_entries(
+        conn,
+        [
+            (1, "txn-001", "2024-03-15", "Test", "item_A"),
+        ],
+    )
 
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),
-                (1, 2, 'credit', 100.00)
-        """)
-        )
+    _seed_lines(
+        conn,
+        [
+            (1, 1, "debit", Decimal("100.00")),
+            (1, 2, "credit", Decimal("100.00")),
+        ],
+    )
 
-        # Balance that rounds to exactly match GL
-        plaid_balances = {
-            "plaid_checking": 100.004  # Should round to 100.00 and pass
-        }
+    # Balance that rounds to exactly match GL
+    plaid_balances = {
+        "plaid_checking": 100.004  # Should round to 100.00 and pass
+    }
 
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
+    result = run_reconciliation(
+        conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
+    )
 
-        # Should pass due to rounding
-        assert result["success"] is True
-        assert result["checks"]["cash_variance"]["passed"] is True
-        assert result["checks"]["cash_variance"]["total_variance"] == pytest.approx(
-            0.00, abs=1e-2
-        )
+    # Should pass due to rounding
+    assert result["success"] is True
+    assert result["checks"]["cash_variance"]["passed"] is True
+    assert result["checks"]["cash_variance"]["total_variance"] == pytest.approx(
+        0.00, abs=1e-2
+    )
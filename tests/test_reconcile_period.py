@@ -1,568 +1,361 @@
 """Tests for period-based reconciliation filtering."""
 
+from __future__ import annotations
+
+import sqlite3
+from contextlib import closing
+from datetime import date
+from typing import TYPE_CHECKING
+
 import pytest
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
 
 from etl.reconcile import run_reconciliation
 
-
-def test_entry_balance_filters_by_period() -> None:
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from sqlalchemy.engine import Engine
+
+    _CloneSchema = Callable[[str], Engine]
+
+
+_ACCOUNTS_DDL = """
+CREATE TABLE accounts (
+    id INTEGER PRIMARY KEY,
+    code TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    is_cash BOOLEAN NOT NULL DEFAULT 0
+);
+"""
+
+_JOURNAL_ENTRIES_DDL = """
+CREATE TABLE journal_entries (
+    id INTEGER PRIMARY KEY,
+    txn_id TEXT UNIQUE NOT NULL,
+    txn_date DATE NOT NULL,
+    description TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    transform_version INTEGER NOT NULL,
+    item_id TEXT
+);
+"""
+
+_JOURNAL_ENTRIES_NULLABLE_LINEAGE_DDL = """
+CREATE TABLE journal_entries (
+    id INTEGER PRIMARY KEY,
+    txn_id TEXT UNIQUE NOT NULL,
+    txn_date DATE NOT NULL,
+    description TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    source_hash TEXT,  -- Allow NULL
+    transform_version INTEGER,  -- Allow NULL
+    item_id TEXT
+);
+"""
+
+_JOURNAL_LINES_DDL = """
+CREATE TABLE journal_lines (
+    id INTEGER PRIMARY KEY,
+    entry_id INTEGER NOT NULL REFERENCES journal_entries(id),
+    account_id INTEGER NOT NULL REFERENCES accounts(id),
+    side TEXT NOT NULL CHECK (side IN ('debit','credit')),
+    amount NUMERIC(18,2) NOT NULL CHECK (amount >= 0)
+);
+"""
+
+_PLAID_ACCOUNTS_DDL = """
+CREATE TABLE plaid_accounts (
+    plaid_account_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    subtype TEXT NOT NULL,
+    currency TEXT NOT NULL
+);
+"""
+
+_ACCOUNT_LINKS_DDL = """
+CREATE TABLE account_links (
+    id INTEGER PRIMARY KEY,
+    plaid_account_id TEXT UNIQUE NOT NULL,
+    account_id INTEGER NOT NULL REFERENCES accounts(id)
+);
+"""
+
+# Same names as etl/sqlite_shim.sql so the period filter and line joins take the
+# indexed paths the production SQLite schema gives them
+_INDEXES_DDL = """
+CREATE INDEX idx_journal_entries_txn_date ON journal_entries(txn_date);
+CREATE INDEX idx_journal_lines_entry_id ON journal_lines(entry_id);
+"""
+
+# Chart shared by every dataset: mapped cash checking (1) and a dining offset (2).
+# Baked into the templates in one transaction, so datasets only add entries.
+_CHART_SQL = """
+BEGIN;
+INSERT INTO accounts (id, code, name, type, is_cash) VALUES
+    (1, 'Assets:Bank:Checking', 'Bank Checking', 'asset', 1),
+    (2, 'Expenses:Dining', 'Dining', 'expense', 0);
+INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
+VALUES ('plaid_checking', 'Checking', 'depository', 'checking', 'USD');
+INSERT INTO account_links (plaid_account_id, account_id)
+VALUES ('plaid_checking', 1);
+COMMIT;
+"""
+
+
+# Each variant is one script so it runs in a single executescript() call
+_SCHEMA_SQL = (
+    _ACCOUNTS_DDL
+    + _JOURNAL_ENTRIES_DDL
+    + _JOURNAL_LINES_DDL
+    + _PLAID_ACCOUNTS_DDL
+    + _ACCOUNT_LINKS_DDL
+    + _INDEXES_DDL
+    + _CHART_SQL
+)
+_NULLABLE_LINEAGE_SCHEMA_SQL = (
+    _ACCOUNTS_DDL
+    + _JOURNAL_ENTRIES_NULLABLE_LINEAGE_DDL
+    + _JOURNAL_LINES_DDL
+    + _PLAID_ACCOUNTS_DDL
+    + _ACCOUNT_LINKS_DDL
+    + _INDEXES_DDL
+    + _CHART_SQL
+)
+
+
+def _cents(amount: float) -> int:
+    """Round a currency amount to whole cents for exact comparison."""
+    return round(amount * 100)
+
+
+@pytest.fixture(scope="module")
+def schema_templates() -> dict[str, bytes]:
+    """Build each schema variant once per module as a serialized SQLite image."""
+    variants = {
+        "strict": _SCHEMA_SQL,
+        "nullable_lineage": _NULLABLE_LINEAGE_SCHEMA_SQL,
+    }
+    templates = {}
+    for name, script in variants.items():
+        with closing(sqlite3.connect(":memory:")) as db:
+            db.executescript(script)
+            templates[name] = db.serialize()
+    return templates
+
+
+@pytest.fixture(scope="module")
+def clone_schema(schema_templates: dict[str, bytes]) -> Iterator[_CloneSchema]:
+    """Return a factory that loads a schema template into a fresh in-memory DB."""
+    engines: list[Engine] = []
+
+    def _clone(variant: str) -> Engine:
+        dbapi_conn = sqlite3.connect(":memory:", check_same_thread=False)
+        # Copies the image as-is: no DDL or INSERT is parsed again
+        dbapi_conn.deserialize(schema_templates[variant])
+        # StaticPool hands out this one connection; the conftest connect hook
+        # turns off synchronous writes and keeps the journal in memory
+        engine = create_engine(
+            "sqlite://", creator=lambda: dbapi_conn, poolclass=StaticPool
+        )
+        engines.append(engine)
+        return engine
+
+    yield _clone
+    for engine in engines:
+        engine.dispose()
+
+
+_INSERT_ENTRY_SQL = (
+    "INSERT INTO journal_entries (id, txn_id, txn_date, description, currency, "
+    "source_hash, transform_version) VALUES (?, ?, ?, ?, 'USD', ?, ?)"
+)
+_INSERT_LINE_SQL = (
+    "INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES (?, ?, ?, ?)"
+)
+
+
+def _seed_entries(
+    db: sqlite3.Connection,
+    rows: list[tuple[int, str, date, float, float]],
+    *,
+    lineage: bool = True,
+) -> None:
+    """Insert USD entries that debit checking (1) and credit dining (2).
+
+    Rows are (id, txn_id, txn_date, debit, credit); the txn_id doubles as the
+    description. lineage=False leaves source_hash and transform_version NULL.
+    Goes straight to the sqlite3 driver and commits both batches together.
+    """
+    entries = [
+        (
+            entry_id,
+            txn_id,
+            txn_date,
+            txn_id,
+            f"hash_{txn_id}" if lineage else None,
+            1 if lineage else None,
+        )
+        for entry_id, txn_id, txn_date, _, _ in rows
+    ]
+    lines = [
+        line
+        for entry_id, *_, debit, credit in rows
+        for line in ((entry_id, 1, "debit", debit), (entry_id, 2, "credit", credit))
+    ]
+    with db:
+        db.executemany(_INSERT_ENTRY_SQL, entries)
+        db.executemany(_INSERT_LINE_SQL, lines)
+
+
+@pytest.fixture(scope="module")
+def entry_balance_db(clone_schema: _CloneSchema) -> Engine:
+    """Balanced Q1 entries and unbalanced Q2 entries, including both boundaries."""
+    engine = clone_schema("strict")
+
+    with closing(engine.raw_connection()) as raw:
+        _seed_entries(
+            raw.driver_connection,
+            [
+                # Q1 2024 balanced entry (mid-quarter)
+                (1, "q1-balanced", date(2024, 2, 15), 100.00, 100.00),
+                # Q1 2024 balanced entry on boundary (2024-03-31 - last day of Q1)
+                (2, "q1-boundary-end", date(2024, 3, 31), 50.00, 50.00),
+                # Q2 2024 unbalanced entry on boundary (2024-04-01 - first day of Q2)
+                (3, "q2-boundary-start", date(2024, 4, 1), 30.00, 40.00),
+                # Q2 2024 unbalanced entry (mid-quarter)
+                (4, "q2-unbalanced", date(2024, 5, 15), 50.00, 75.00),
+            ],
+        )
+
+    return engine
+
+
+@pytest.mark.parametrize(
+    ("period", "expected_passed", "expected_unbalanced"),
+    [
+        # Q1 sees both balanced Q1 entries and ignores Q2
+        pytest.param("2024Q1", True, [], id="q1-balanced"),
+        # Q2 includes both unbalanced entries, the 2024-04-01 boundary among them
+        pytest.param(
+            "2024Q2", False, ["q2-boundary-start", "q2-unbalanced"], id="q2-unbalanced"
+        ),
+    ],
+)
+def test_entry_balance_filters_by_period(
+    entry_balance_db: Engine,
+    period: str,
+    expected_passed: bool,
+    expected_unbalanced: list[str],
+) -> None:
     """Test that entry balance check only validates entries within period."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        # Create minimal schema
-        conn.execute(
-            text("""
-            CREATE TABLE accounts (
-                id INTEGER PRIMARY KEY,
-                code TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                is_cash BOOLEAN NOT NULL DEFAULT 0
-            )
-        """)
-        )
-
-        conn.execute(
-            text("""
-            CREATE TABLE journal_entries (
-                id INTEGER PRIMARY KEY,
-                txn_id TEXT UNIQUE NOT NULL,
-                txn_date DATE NOT NULL,
-                description TEXT NOT NULL,
-                currency TEXT NOT NULL,
-                source_hash TEXT NOT NULL,
-                transform_version INTEGER NOT NULL,
-                item_id TEXT
-            )
-        """)
-        )
-
-        conn.execute(
-            text("""
-            CREATE TABLE journal_lines (
-                id INTEGER PRIMARY KEY,
-                entry_id INTEGER NOT NULL REFERENCES journal_entries(id),
-                account_id INTEGER NOT NULL REFERENCES accounts(id),
-                side TEXT NOT NULL CHECK (side IN ('debit','credit')),
-                amount NUMERIC(18,2) NOT NULL CHECK (amount >= 0)
-            )
-        """)
-        )
-
-        conn.execute(
-            text("""
-            CREATE TABLE plaid_accounts (
-                plaid_account_id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                subtype TEXT NOT NULL,
-                currency TEXT NOT NULL
-            )
-        """)
-        )
-
-        conn.execute(
-            text("""
-            CREATE TABLE account_links (
-                id INTEGER PRIMARY KEY,
-                plaid_account_id TEXT UNIQUE NOT NULL,
-                account_id INTEGER NOT NULL REFERENCES accounts(id)
-            )
-        """)
-        )
-
-        # Seed accounts
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Bank Checking', 'asset', 1),
-                (2, 'Expenses:Dining', 'Dining', 'expense', 0)
-        """)
-        )
-
-        # Seed mapping for the cash account
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES ('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES ('plaid_checking', 1)
-        """)
-        )
-
-        # Q1 2024 balanced entry (mid-quarter)
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version)
-            VALUES (1, 'q1-balanced', '2024-02-15', 'Q1 balanced entry', 'USD',
-                   'hash_q1', 1)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),
-                (1, 2, 'credit', 100.00)
-        """)
-        )
-
-        # Q1 2024 balanced entry on boundary (2024-03-31 - last day of Q1)
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version)
-            VALUES (2, 'q1-boundary-end', '2024-03-31',
-                    'Q1 boundary end balanced', 'USD',
-                   'hash_q1_boundary', 1)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (2, 1, 'debit', 50.00),
-                (2, 2, 'credit', 50.00)
-        """)
-        )
-
-        # Q2 2024 unbalanced entry on boundary (2024-04-01 - first day of Q2)
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version)
-            VALUES (3, 'q2-boundary-start', '2024-04-01',
-                    'Q2 boundary start unbalanced', 'USD',
-                   'hash_q2_boundary', 1)
-        """)
-        )
+    with entry_balance_db.connect() as conn:
+        result = run_reconciliation(conn, period=period, plaid_balances={})
 
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (3, 1, 'debit', 30.00),
-                (3, 2, 'credit', 40.00)  -- Intentionally unbalanced
-        """)
-        )
-
-        # Q2 2024 unbalanced entry (mid-quarter)
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version)
-            VALUES (4, 'q2-unbalanced', '2024-05-15', 'Q2 unbalanced entry', 'USD',
-                   'hash_q2', 1)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (4, 1, 'debit', 50.00),
-                (4, 2, 'credit', 75.00)  -- Intentionally unbalanced
-        """)
-        )
-
-        # Test Q1 reconciliation - should pass (sees balanced entries, ignores Q2)
-        result_q1 = run_reconciliation(conn, period="2024Q1", plaid_balances={})
-
-        # Test Q2 reconciliation - should fail (includes unbalanced entries)
-        result_q2 = run_reconciliation(conn, period="2024Q2", plaid_balances={})
-
-        # Q1 should pass entry balance check (sees both balanced Q1 entries)
-        assert result_q1["checks"]["entry_balance"]["passed"] is True
-        assert len(result_q1["checks"]["entry_balance"]["unbalanced_entries"]) == 0
-
-        # Q2 should fail entry balance check (includes 2 unbalanced entries)
-        assert result_q2["checks"]["entry_balance"]["passed"] is False
-        assert len(result_q2["checks"]["entry_balance"]["unbalanced_entries"]) == 2
-        assert (
-            "q2-boundary-start"
-            in result_q2["checks"]["entry_balance"]["unbalanced_entries"]
-        )
-        assert (
-            "q2-unbalanced"
-            in result_q2["checks"]["entry_balance"]["unbalanced_entries"]
-        )
-
-
-def test_cash_variance_uses_asof_semantics() -> None:
-    """Test that cash variance uses as-of (cumulative) GL balances through period."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        # Create schema
-        conn.execute(
-            text("""
-            CREATE TABLE accounts (
-                id INTEGER PRIMARY KEY,
-                code TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                is_cash BOOLEAN NOT NULL DEFAULT 0
-            )
-        """)
-        )
-
-        conn.execute(
-            text("""
-            CREATE TABLE journal_entries (
-                id INTEGER PRIMARY KEY,
-                txn_id TEXT UNIQUE NOT NULL,
-                txn_date DATE NOT NULL,
-                description TEXT NOT NULL,
-                currency TEXT NOT NULL,
-                source_hash TEXT NOT NULL,
-                transform_version INTEGER NOT NULL,
-                item_id TEXT
-            )
-        """)
-        )
-
-        conn.execute(
-            text("""
-            CREATE TABLE journal_lines (
-                id INTEGER PRIMARY KEY,
-                entry_id INTEGER NOT NULL REFERENCES journal_entries(id),
-                account_id INTEGER NOT NULL REFERENCES accounts(id),
-                side TEXT NOT NULL CHECK (side IN ('debit','credit')),
-                amount NUMERIC(18,2) NOT NULL CHECK (amount >= 0)
-            )
-        """)
-        )
-
-        conn.execute(
-            text("""
-            CREATE TABLE plaid_accounts (
-                plaid_account_id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                subtype TEXT NOT NULL,
-                currency TEXT NOT NULL
-            )
-        """)
-        )
+    entry_balance = result["checks"]["entry_balance"]
+    assert entry_balance["passed"] is expected_passed
+    assert sorted(entry_balance["unbalanced_entries"]) == expected_unbalanced
 
-        conn.execute(
-            text("""
-            CREATE TABLE account_links (
-                id INTEGER PRIMARY KEY,
-                plaid_account_id TEXT UNIQUE NOT NULL,
-                account_id INTEGER NOT NULL REFERENCES accounts(id)
-            )
-        """)
-        )
 
-        # Seed data
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Bank Checking', 'asset', 1),
-                (2, 'Expenses:Dining', 'Dining', 'expense', 0)
-        """)
-        )
+@pytest.fixture(scope="module")
+def asof_cash_db(clone_schema: _CloneSchema) -> Engine:
+    """Cash increases of $150 in Q1 and $200 in Q2, including both boundaries."""
+    engine = clone_schema("strict")
 
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES ('plaid_checking', 'Chase Checking', 'depository', 'checking', 'USD')
-        """)
+    with closing(engine.raw_connection()) as raw:
+        _seed_entries(
+            raw.driver_connection,
+            [
+                # Q1 2024: cash increases by $100 (mid-quarter)
+                (1, "q1-cash", date(2024, 3, 15), 100.00, 100.00),
+                # Q1 2024: cash +$50 on boundary (2024-03-31 - last day of Q1)
+                (2, "q1-boundary-cash", date(2024, 3, 31), 50.00, 50.00),
+                # Q2 2024: cash +$75 on boundary (2024-04-01 - first day of Q2)
+                (3, "q2-boundary-cash", date(2024, 4, 1), 75.00, 75.00),
+                # Q2 2024: cash increases by $125 more (mid-quarter)
+                (4, "q2-cash", date(2024, 6, 15), 125.00, 125.00),
+            ],
         )
 
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES ('plaid_checking', 1)
-        """)
-        )
+    return engine
 
-        # Q1 2024: cash increases by $100 (mid-quarter)
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version)
-            VALUES (1, 'q1-cash', '2024-03-15', 'Q1 cash increase', 'USD',
-                   'hash_q1_cash', 1)
-        """)
-        )
 
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),
-                (1, 2, 'credit', 100.00)
-        """)
-        )
-
-        # Q1 2024: cash increases by $50 on boundary (2024-03-31 - last day of Q1)
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version)
-            VALUES (2, 'q1-boundary-cash', '2024-03-31',
-                    'Q1 boundary cash increase', 'USD',
-                   'hash_q1_boundary_cash', 1)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (2, 1, 'debit', 50.00),
-                (2, 2, 'credit', 50.00)
-        """)
-        )
-
-        # Q2 2024: cash increases by $75 on boundary (2024-04-01 - first day of Q2)
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version)
-            VALUES (3, 'q2-boundary-cash', '2024-04-01',
-                    'Q2 boundary cash increase', 'USD',
-                   'hash_q2_boundary_cash', 1)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (3, 1, 'debit', 75.00),
-                (3, 2, 'credit', 75.00)
-        """)
-        )
-
-        # Q2 2024: cash increases by $125 more (mid-quarter)
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version)
-            VALUES (4, 'q2-cash', '2024-06-15', 'Q2 cash increase', 'USD',
-                   'hash_q2_cash', 1)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (4, 1, 'debit', 125.00),
-                (4, 2, 'credit', 125.00)
-        """)
-        )
-
-        # Test Q1 reconciliation with end-of-period balance
+@pytest.mark.parametrize(
+    ("period", "plaid_ending_balance"),
+    [
         # Q1 movements: $100 (mid-quarter) + $50 (boundary) = $150 total
-        plaid_ending_balances_q1 = {"plaid_checking": 150.00}  # End of Q1: $150
-        result_q1 = run_reconciliation(
-            conn, period="2024Q1", plaid_balances=plaid_ending_balances_q1
-        )
-
-        # Test Q2 reconciliation with as-of end-of-period balance
+        pytest.param("2024Q1", 150.00, id="q1-end"),
         # Q2 movements: $75 (boundary) + $125 (mid-quarter) = $200 period total
         # End of Q2 cumulative (as-of): $150 (from Q1) + $200 (Q2) = $350 total
-        plaid_ending_balances_q2 = {
-            "plaid_checking": 350.00
-        }  # As-of Q2 end: cumulative
-        result_q2 = run_reconciliation(
-            conn, period="2024Q2", plaid_balances=plaid_ending_balances_q2
-        )
-
-        # Q1 should pass variance check (GL end-of-Q1: $150, Plaid: $150)
-        assert result_q1["checks"]["cash_variance"]["passed"] is True
-        assert result_q1["checks"]["cash_variance"]["variance"] == pytest.approx(
-            0.00, abs=1e-2
-        )
-
-        # Q2 should pass variance check (GL as-of Q2: $350, Plaid: $350)
-        assert result_q2["checks"]["cash_variance"]["passed"] is True
-        assert result_q2["checks"]["cash_variance"]["variance"] == pytest.approx(
-            0.00, abs=1e-2
-        )
-
-
-def test_lineage_presence_filters_by_period() -> None:
+        pytest.param("2024Q2", 350.00, id="q2-asof"),
+    ],
+)
+def test_cash_variance_uses_asof_semantics(
+    asof_cash_db: Engine, period: str, plaid_ending_balance: float
+) -> None:
+    """Test that cash variance uses as-of (cumulative) GL balances through period."""
+    with asof_cash_db.connect() as conn:
+        result = run_reconciliation(
+            conn, period=period, plaid_balances={"plaid_checking": plaid_ending_balance}
+        )
+
+    # GL as-of period end matches the Plaid ending balance
+    assert result["checks"]["cash_variance"]["passed"] is True
+    assert _cents(result["checks"]["cash_variance"]["variance"]) == 0
+
+
+@pytest.fixture(scope="module")
+def lineage_db(clone_schema: _CloneSchema) -> Engine:
+    """Q1 entries with lineage and Q2 entries without, including both boundaries."""
+    # Lineage columns allow NULL so entries with missing lineage can be seeded
+    engine = clone_schema("nullable_lineage")
+
+    with closing(engine.raw_connection()) as raw:
+        _seed_entries(
+            raw.driver_connection,
+            [
+                # Q1 2024: good lineage (mid-quarter)
+                (1, "q1-good-lineage", date(2024, 1, 15), 50.00, 50.00),
+                # Q1 2024: good lineage on boundary (2024-03-31 - last day of Q1)
+                (2, "q1-boundary-lineage", date(2024, 3, 31), 30.00, 30.00),
+            ],
+        )
+        _seed_entries(
+            raw.driver_connection,
+            [
+                # Q2 2024: missing lineage on boundary (2024-04-01 - first day of Q2)
+                (3, "q2-boundary-missing", date(2024, 4, 1), 20.00, 20.00),
+                # Q2 2024: missing lineage (mid-quarter)
+                (4, "q2-missing-lineage", date(2024, 4, 15), 25.00, 25.00),
+            ],
+            lineage=False,
+        )
+
+    return engine
+
+
+@pytest.mark.parametrize(
+    ("period", "expected_passed", "expected_missing"),
+    [
+        # Q1 sees both good lineage Q1 entries and ignores Q2
+        pytest.param("2024Q1", True, 0, id="q1-good-lineage"),
+        # Q2 includes both missing lineage entries
+        pytest.param("2024Q2", False, 2, id="q2-missing-lineage"),
+    ],
+)
+def test_lineage_presence_filters_by_period(
+    lineage_db: Engine,
+    period: str,
+    expected_passed: bool,
+    expected_missing: int,
+) -> None:
     """Test that lineage check only validates entries within period."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        # Create schema (allowing NULLs for lineage test)
-        conn.execute(
-            text("""
-            CREATE TABLE accounts (
-                id INTEGER PRIMARY KEY,
-                code TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                is_cash BOOLEAN NOT NULL DEFAULT 0
-            )
-        """)
-        )
-
-        conn.execute(
-            text("""
-            CREATE TABLE journal_entries (
-                id INTEGER PRIMARY KEY,
-                txn_id TEXT UNIQUE NOT NULL,
-                txn_date DATE NOT NULL,
-                description TEXT NOT NULL,
-                currency TEXT NOT NULL,
-                source_hash TEXT,  -- Allow NULL
-                transform_version INTEGER,  -- Allow NULL
-                item_id TEXT
-            )
-        """)
-        )
-
-        conn.execute(
-            text("""
-            CREATE TABLE journal_lines (
-                id INTEGER PRIMARY KEY,
-                entry_id INTEGER NOT NULL REFERENCES journal_entries(id),
-                account_id INTEGER NOT NULL REFERENCES accounts(id),
-                side TEXT NOT NULL CHECK (side IN ('debit','credit')),
-                amount NUMERIC(18,2) NOT NULL CHECK (amount >= 0)
-            )
-        """)
-        )
-
-        conn.execute(
-            text("""
-            CREATE TABLE plaid_accounts (
-                plaid_account_id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                subtype TEXT NOT NULL,
-                currency TEXT NOT NULL
-            )
-        """)
-        )
-
-        conn.execute(
-            text("""
-            CREATE TABLE account_links (
-                id INTEGER PRIMARY KEY,
-                plaid_account_id TEXT UNIQUE NOT NULL,
-                account_id INTEGER NOT NULL REFERENCES accounts(id)
-            )
-        """)
-        )
-
-        # Seed accounts
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type) VALUES
-                (1, 'Assets:Bank:Checking', 'Bank Checking', 'asset'),
-                (2, 'Expenses:Dining', 'Dining', 'expense')
-        """)
-        )
-
-        # Seed mapping for the cash account
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES ('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES ('plaid_checking', 1)
-        """)
-        )
-
-        # Q1 2024: good lineage (mid-quarter)
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version)
-            VALUES (1, 'q1-good-lineage', '2024-01-15', 'Q1 good lineage', 'USD',
-                   'hash_q1_good', 1)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 50.00),
-                (1, 2, 'credit', 50.00)
-        """)
-        )
-
-        # Q1 2024: good lineage on boundary (2024-03-31 - last day of Q1)
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version)
-            VALUES (2, 'q1-boundary-lineage', '2024-03-31',
-                    'Q1 boundary good lineage', 'USD',
-                   'hash_q1_boundary_good', 1)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (2, 1, 'debit', 30.00),
-                (2, 2, 'credit', 30.00)
-        """)
-        )
-
-        # Q2 2024: missing lineage on boundary (2024-04-01 - first day of Q2)
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version)
-            VALUES (3, 'q2-boundary-missing', '2024-04-01',
-                    'Q2 boundary missing lineage', 'USD',
-                   NULL, NULL)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (3, 1, 'debit', 20.00),
-                (3, 2, 'credit', 20.00)
-        """)
-        )
-
-        # Q2 2024: missing lineage (mid-quarter)
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version)
-            VALUES (4, 'q2-missing-lineage', '2024-04-15', 'Q2 missing lineage', 'USD',
-                   NULL, NULL)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (4, 1, 'debit', 25.00),
-                (4, 2, 'credit', 25.00)
-        """)
-        )
-
-        # Test Q1 reconciliation - should pass (sees good lineage entries, ignores Q2)
-        result_q1 = run_reconciliation(conn, period="2024Q1", plaid_balances={})
-
-        # Test Q2 reconciliation - should fail (includes missing lineage entries)
-        result_q2 = run_reconciliation(conn, period="2024Q2", plaid_balances={})
-
-        # Q1 should pass lineage check (sees both good lineage Q1 entries)
-        assert result_q1["checks"]["lineage"]["passed"] is True
-        assert result_q1["checks"]["lineage"]["missing_lineage"] == 0
+    with lineage_db.connect() as conn:
+        result = run_reconciliation(conn, period=period, plaid_balances={})
 
-        # Q2 should fail lineage check (includes 2 missing lineage entries)
-        assert result_q2["checks"]["lineage"]["passed"] is False
-        assert result_q2["checks"]["lineage"]["missing_lineage"] == 2
+    assert result["checks"]["lineage"]["passed"] is expected_passed
+    assert result["checks"]["lineage"]["missing_lineage"] == expected_missing
@@ -2,928 +2,446 @@
 
 from __future__ import annotations
 
-from typing import Any
+import re
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
 
 import pytest
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import StaticPool
 
 from etl.reconcile import run_reconciliation
-
-
-def _create_test_schema(conn: Any) -> None:
-    """Create test database schema with item_id support."""
-    conn.execute(
-        text("""
-        CREATE TABLE accounts (
-            id INTEGER PRIMARY KEY,
-            code TEXT UNIQUE NOT NULL,
-            name TEXT NOT NULL,
-            type TEXT NOT NULL,
-            is_cash BOOLEAN NOT NULL DEFAULT 0
-        )
-    """)
+from tests.conftest import INS_ACCOUNT, INS_LINE, INS_LINK, INS_PLAID, run_script
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from sqlalchemy.engine import Connection, Engine
+
+
+_SCHEMA_SQL = """
+CREATE TABLE accounts (
+    id INTEGER PRIMARY KEY,
+    code TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    is_cash BOOLEAN NOT NULL DEFAULT 0
+);
+CREATE TABLE journal_entries (
+    id INTEGER PRIMARY KEY,
+    txn_id TEXT UNIQUE NOT NULL,
+    txn_date DATE NOT NULL,
+    description TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    transform_version INTEGER NOT NULL,
+    item_id TEXT
+);
+CREATE TABLE journal_lines (
+    id INTEGER PRIMARY KEY,
+    entry_id INTEGER NOT NULL REFERENCES journal_entries(id),
+    account_id INTEGER NOT NULL REFERENCES accounts(id),
+    side TEXT NOT NULL CHECK (side IN ('debit','credit')),
+    amount NUMERIC(18,2) NOT NULL CHECK (amount >= 0)
+);
+CREATE TABLE plaid_accounts (
+    plaid_account_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    subtype TEXT NOT NULL,
+    currency TEXT NOT NULL
+);
+CREATE TABLE account_links (
+    id INTEGER PRIMARY KEY,
+    plaid_account_id TEXT UNIQUE NOT NULL
+        REFERENCES plaid_accounts(plaid_account_id),
+    account_id INTEGER NOT NULL REFERENCES accounts(id)
+);
+CREATE TABLE etl_events (
+    id INTEGER PRIMARY KEY,
+    event_type TEXT NOT NULL,
+    item_id TEXT,
+    period TEXT,
+    success BOOLEAN NOT NULL,
+    row_counts TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT NOT NULL
+);
+"""
+
+
+# Entry insert with every column _seed_entry() fills; the rest come from conftest
+_INS_ENTRY = text(
+    "INSERT INTO journal_entries (id, txn_id, txn_date, description, "
+    "currency, source_hash, transform_version, item_id) "
+    "VALUES (:id, :txn_id, :txn_date, :description, :currency, "
+    ":source_hash, :transform_version, :item_id)"
+)
+
+
+_CHECKING_ACCOUNT = {
+    "id": 1,
+    "code": "Assets:Bank:Checking",
+    "name": "Checking",
+    "type": "asset",
+    "is_cash": 1,
+}
+_EXPENSE_ACCOUNT = {
+    "id": 2,
+    "code": "Expenses:Other",
+    "name": "Other",
+    "type": "expense",
+    "is_cash": 0,
+}
+
+
+def _seed_checking(conn: Connection, *, with_expense: bool = True) -> None:
+    """Seed the cash checking account with plaid_checking mapped to it.
+
+    The unmapped expense account is the offset side for _seed_entry().
+    """
+    accounts = (
+        [_CHECKING_ACCOUNT, _EXPENSE_ACCOUNT] if with_expense else [_CHECKING_ACCOUNT]
     )
-
+    conn.execute(INS_ACCOUNT, accounts)
     conn.execute(
-        text("""
-        CREATE TABLE journal_entries (
-            id INTEGER PRIMARY KEY,
-            txn_id TEXT UNIQUE NOT NULL,
-            txn_date DATE NOT NULL,
-            description TEXT NOT NULL,
-            currency TEXT NOT NULL,
-            source_hash TEXT NOT NULL,
-            transform_version INTEGER NOT NULL,
-            item_id TEXT
-        )
-    """)
+        INS_PLAID,
+        {
+            "plaid_account_id": "plaid_checking",
+            "name": "Checking",
+            "type": "depository",
+            "subtype": "checking",
+            "currency": "USD",
+        },
     )
-
     conn.execute(
-        text("""
-        CREATE TABLE journal_lines (
-            id INTEGER PRIMARY KEY,
-            entry_id INTEGER NOT NULL REFERENCES journal_entries(id),
-            account_id INTEGER NOT NULL REFERENCES accounts(id),
-            side TEXT NOT NULL CHECK (side IN ('debit','credit')),
-            amount NUMERIC(18,2) NOT NULL CHECK (amount >= 0)
-        )
-    """)
+        INS_LINK,
+        {"plaid_account_id": "plaid_checking", "account_id": 1},
     )
 
+
+def _seed_entry(
+    conn: Connection, entry_id: int, txn_date: str, amount: float, *, item_id: str
+) -> None:
+    """Seed one balanced entry: debit checking, credit expense by ``amount``."""
     conn.execute(
-        text("""
-        CREATE TABLE plaid_accounts (
-            plaid_account_id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            type TEXT NOT NULL,
-            subtype TEXT NOT NULL,
-            currency TEXT NOT NULL
-        )
-    """)
+        _INS_ENTRY,
+        {
+            "id": entry_id,
+            "txn_id": f"txn-{entry_id:03d}",
+            "txn_date": txn_date,
+            "description": "Test",
+            "currency": "USD",
+            "source_hash": f"hash{entry_id}",
+            "transform_version": 1,
+            "item_id": item_id,
+        },
     )
-
     conn.execute(
-        text("""
-        CREATE TABLE account_links (
-            id INTEGER PRIMARY KEY,
-            plaid_account_id TEXT UNIQUE NOT NULL
-                REFERENCES plaid_accounts(plaid_account_id),
-            account_id INTEGER NOT NULL REFERENCES accounts(id)
-        )
-    """)
+        INS_LINE,
+        [
+            {"entry_id": entry_id, "account_id": 1, "side": "debit", "amount": amount},
+            {"entry_id": entry_id, "account_id": 2, "side": "credit", "amount": amount},
+        ],
     )
 
-    conn.execute(
-        text("""
-        CREATE TABLE etl_events (
-            id INTEGER PRIMARY KEY,
-            event_type TEXT NOT NULL,
-            item_id TEXT,
-            period TEXT,
-            success BOOLEAN NOT NULL,
-            row_counts TEXT NOT NULL,
-            started_at TEXT NOT NULL,
-            finished_at TEXT NOT NULL
-        )
-    """)
+
+# A write verb leading the statement, or leading it after a WITH clause
+_WRITE_RE = re.compile(
+    r"^\s*(?:WITH\b.*?\)\s*)?(?:INSERT|UPDATE|DELETE|REPLACE)\b",
+    re.IGNORECASE | re.DOTALL,
+)
+_COUNT_EVENTS = text("SELECT COUNT(*) FROM etl_events")
+
+
+@contextmanager
+def _track_writes(conn: Connection) -> Iterator[list[str]]:
+    """Collect every write made to ``conn``'s database inside the block.
+
+    The tap sits on the engine, so statements from any Connection it hands
+    out are seen. Rows written straight through the sqlite3 driver bypass
+    engine events, so a total_changes delta with no tapped statement is
+    recorded as well.
+    """
+    writes: list[str] = []
+
+    def _tap(
+        _conn: Any,
+        _cursor: Any,
+        statement: str,
+        _parameters: Any,
+        _context: Any,
+        _executemany: bool,
+    ) -> None:
+        if _WRITE_RE.match(statement):
+            writes.append(statement)
+
+    driver = conn.connection.driver_connection
+    changes_before = driver.total_changes
+    event.listen(conn.engine, "before_cursor_execute", _tap)
+    try:
+        yield writes
+    finally:
+        event.remove(conn.engine, "before_cursor_execute", _tap)
+    untapped = driver.total_changes - changes_before
+    if untapped and not writes:
+        writes.append(f"<{untapped} row(s) changed outside SQLAlchemy>")
+
+
+@pytest.fixture(scope="module")
+def schema_engine() -> Iterator[Engine]:
+    """One in-memory engine per module with the schema created once.
+
+    StaticPool pins the single sqlite3 connection that owns the database, so
+    every checkout sees the schema and nothing is ever reconnected.
+    """
+    eng = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
     )
+    with eng.begin() as conn:
+        run_script(conn, _SCHEMA_SQL)
+    yield eng
+    eng.dispose()
 
 
-def test_reconcile_success_returns_structure() -> None:
-    """Test successful reconciliation structure without writing ETL events."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup accounts and mappings
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
+@pytest.fixture
+def conn(schema_engine: Engine) -> Iterator[Connection]:
+    """Connection inside a transaction that is rolled back after the test.
 
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
+    Seeds and reconciliation reads share it, so every test starts from the
+    empty schema without re-running any DDL.
+    """
+    with schema_engine.connect() as connection:
+        transaction = connection.begin()
+        yield connection
+        transaction.rollback()
 
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
 
-        # Create balanced entry
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES(1, 'txn-001', '2024-01-15', 'Test', 'USD', 'hash1', 1, 'item_TEST')
-        """)
-        )
+def test_reconcile_success_returns_structure(conn: Connection) -> None:
+    """Test successful reconciliation structure without writing ETL events."""
+    _seed_checking(conn)
 
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),
-                (1, 2, 'credit', 100.00)
-        """)
-        )
+    # Create balanced entry
+    _seed_entry(conn, 1, "2024-01-15", 100.00, item_id="item_TEST")
 
-        # Count ETL events before reconciliation
-        event_count_before = conn.execute(
-            text("SELECT COUNT(*) FROM etl_events")
-        ).scalar()
+    plaid_balances = {"plaid_checking": 100.00}
 
-        plaid_balances = {"plaid_checking": 100.00}
+    event_count_before = conn.execute(_COUNT_EVENTS).scalar()
 
-        # Run reconciliation (should be pure)
+    # Run reconciliation (should be pure)
+    with _track_writes(conn) as writes:
         result = run_reconciliation(
             conn, period="2024Q1", item_id="item_TEST", plaid_balances=plaid_balances
         )
 
-        # Count ETL events after reconciliation - should be unchanged
-        event_count_after = conn.execute(
-            text("SELECT COUNT(*) FROM etl_events")
-        ).scalar()
-
-        # Assert pure function behavior: no side effects
-        assert event_count_before == event_count_after, (
-            "run_reconciliation wrote ETL events (violates purity)"
-        )
+    # Assert pure function behavior: no side effects
+    assert writes == [], "run_reconciliation wrote to the database (violates purity)"
+    assert conn.execute(_COUNT_EVENTS).scalar() == event_count_before, (
+        "run_reconciliation wrote ETL events (violates purity)"
+    )
 
-        # Assert proper structure returned
-        assert result["success"] is True
-        assert "checks" in result
-        assert "by_account" in result
-        assert "total_variance" in result
+    # Assert proper structure returned
+    assert result["success"] is True
+    assert "checks" in result
+    assert "by_account" in result
+    assert "total_variance" in result
 
-        # Assert checks structure
-        assert result["checks"]["entry_balance"]["passed"] is True
-        assert result["checks"]["cash_variance"]["passed"] is True
-        assert result["checks"]["coverage"]["passed"] is True
+    # Assert checks structure
+    assert result["checks"]["entry_balance"]["passed"] is True
+    assert result["checks"]["cash_variance"]["passed"] is True
+    assert result["checks"]["coverage"]["passed"] is True
 
 
-def test_reconcile_failure_propagates() -> None:
+def test_reconcile_failure_propagates(conn: Connection) -> None:
     """Test failed reconciliation returns success=False without ETL events."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup accounts and mappings
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
+    _seed_checking(conn)
 
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
+    # Create balanced entry with GL balance of 100.00
+    _seed_entry(conn, 1, "2024-01-15", 100.00, item_id="item_TEST")
 
-        # Create balanced entry with GL balance of 100.00
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES(1, 'txn-001', '2024-01-15', 'Test', 'USD', 'hash1', 1, 'item_TEST')
-        """)
-        )
+    # Plaid balance that will cause variance failure (>0.01 tolerance)
+    plaid_balances = {"plaid_checking": 50.00}  # 50.00 variance
 
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),
-                (1, 2, 'credit', 100.00)
-        """)
-        )
+    event_count_before = conn.execute(_COUNT_EVENTS).scalar()
 
-        # Count ETL events before reconciliation
-        event_count_before = conn.execute(
-            text("SELECT COUNT(*) FROM etl_events")
-        ).scalar()
-
-        # Plaid balance that will cause variance failure (>0.01 tolerance)
-        plaid_balances = {"plaid_checking": 50.00}  # 50.00 variance
-
-        # Run reconciliation (should fail but be pure)
+    # Run reconciliation (should fail but be pure)
+    with _track_writes(conn) as writes:
         result = run_reconciliation(
             conn, period="2024Q1", item_id="item_TEST", plaid_balances=plaid_balances
         )
 
-        # Count ETL events after reconciliation - should be unchanged
-        event_count_after = conn.execute(
-            text("SELECT COUNT(*) FROM etl_events")
-        ).scalar()
-
-        # Assert pure function behavior: no side effects even on failure
-        assert event_count_before == event_count_after, (
-            "run_reconciliation wrote ETL events on failure (violates purity)"
-        )
+    # Assert pure function behavior: no side effects even on failure
+    assert writes == [], "run_reconciliation wrote on failure (violates purity)"
+    assert conn.execute(_COUNT_EVENTS).scalar() == event_count_before, (
+        "run_reconciliation wrote ETL events on failure (violates purity)"
+    )
 
-        # Assert failure propagated correctly
-        assert result["success"] is False
-        assert result["checks"]["cash_variance"]["passed"] is False
-        assert result["total_variance"] == pytest.approx(50.00, abs=1e-2)
-
-        # Run multiple times to verify consistent purity
-        for _ in range(3):
-            run_reconciliation(
-                conn,
-                period="2024Q1",
-                item_id="item_TEST",
-                plaid_balances=plaid_balances,
-            )
-
-        # Count should remain unchanged after multiple calls
-        final_count = conn.execute(text("SELECT COUNT(*) FROM etl_events")).scalar()
-        assert event_count_before == final_count, (
-            f"Expected {event_count_before} ETL events, got {final_count} - "
-            "run_reconciliation violates purity"
-        )
+    # Assert failure propagated correctly
+    assert result["success"] is False
+    assert result["checks"]["cash_variance"]["passed"] is False
+    assert result["total_variance"] == pytest.approx(50.00, abs=1e-2)
 
 
-def test_reconcile_item_scoping_isolation() -> None:
+def test_reconcile_item_scoping_isolation(conn: Connection) -> None:
     """Test that run_reconciliation filters by item_id and ignores other items."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup accounts
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
-
-        # Create entries for TWO different item_ids
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id) VALUES
-                (1, 'item-A-txn', '2024-01-15', 'Item A', 'USD', 'hashA', 1, 'item_A'),
-                (2, 'item-B-txn', '2024-01-20', 'Item B', 'USD', 'hashB', 1, 'item_B')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),   -- Item A: +100 to checking
-                (1, 2, 'credit', 100.00),
-                (2, 1, 'debit', 200.00),   -- Item B: +200 to checking
-                (2, 2, 'credit', 200.00)
-        """)
-        )
-
-        plaid_balances = {"plaid_checking": 100.00}  # Should match item A only
-
-        # Run reconciliation scoped to item_A
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
-
-        # Should succeed because item_A GL balance = 100.00 matches plaid balance
-        assert result["success"] is True
-        assert result["total_variance"] == pytest.approx(0.00, abs=1e-2)
-
-        # Verify item scoping worked - only one account processed
-        assert len(result["by_account"]) == 1
-        acct = result["by_account"][0]
-        assert acct["variance"] == pytest.approx(0.00, abs=1e-2)
-
-
-def test_reconcile_tolerance_boundary_pass() -> None:
-    """Test that variance of 0.009 passes (within ±0.01 tolerance)."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup account
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
-
-        # Create entry for 100.00
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES(1, 'txn-001', '2024-01-15', 'Test', 'USD', 'hash1', 1, 'item_A')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),
-                (1, 2, 'credit', 100.00)
-        """)
-        )
-
-        # Balance with 0.009 variance (within tolerance)
-        plaid_balances = {"plaid_checking": 100.009}
-
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
-
-        # Should pass - 0.009 < 0.01 tolerance
-        assert result["success"] is True
-        assert result["checks"]["cash_variance"]["passed"] is True
-        assert result["total_variance"] == pytest.approx(0.009, abs=1e-3)
-
-
-def test_reconcile_tolerance_boundary_fail() -> None:
-    """Test that variance of 0.011 fails (exceeds ±0.01 tolerance)."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup account
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
-
-        # Create entry for 100.00
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES(1, 'txn-001', '2024-01-15', 'Test', 'USD', 'hash1', 1, 'item_A')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),
-                (1, 2, 'credit', 100.00)
-        """)
-        )
-
-        # Balance with 0.015 variance (exceeds tolerance after rounding)
-        plaid_balances = {"plaid_checking": 100.015}
-
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
-
-        # Should fail - 0.015 rounds to 0.02 > 0.01 tolerance
-        assert result["success"] is False
-        assert result["checks"]["cash_variance"]["passed"] is False
-        assert result["total_variance"] == pytest.approx(0.015, abs=1e-3)
-
-
-def test_reconcile_tolerance_boundary_equal_pass() -> None:
-    """Test that variance of exactly 0.01 passes (inclusive boundary)."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup account
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
-
-        # Create entry for 100.00
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES(1, 'txn-001', '2024-01-15', 'Test', 'USD', 'hash1', 1, 'item_A')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),
-                (1, 2, 'credit', 100.00)
-        """)
-        )
-
-        # Balance with exactly 0.01 variance (boundary case)
-        plaid_balances = {"plaid_checking": 100.010}
-
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
-
-        # Should pass - tolerance is inclusive: abs(variance) <= 0.01
-        assert result["success"] is True
-        assert result["checks"]["cash_variance"]["passed"] is True
-        assert result["total_variance"] == pytest.approx(0.010, abs=1e-3)
-
-
-def test_reconcile_tolerance_inclusive_positive() -> None:
-    """Test that positive variance of +0.01 passes (inclusive boundary)."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup account
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
-
-        # Create entry for 100.00
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES(1, 'txn-001', '2024-01-15', 'Test', 'USD', 'hash1', 1, 'item_A')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),
-                (1, 2, 'credit', 100.00)
-        """)
-        )
-
-        # Balance exactly +0.01 higher than GL
-        plaid_balances = {"plaid_checking": 100.01}
-
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
-
-        # Should pass - tolerance is inclusive: abs(+0.01) <= 0.01
-        assert result["success"] is True
-        assert result["checks"]["cash_variance"]["passed"] is True
-        assert result["total_variance"] == pytest.approx(0.01, abs=1e-3)
-
-
-def test_reconcile_tolerance_inclusive_negative() -> None:
-    """Test that negative variance of -0.01 passes (inclusive boundary)."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup account
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
+    _seed_checking(conn)
 
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
+    # Create entries for TWO different item_ids
+    _seed_entry(conn, 1, "2024-01-15", 100.00, item_id="item_A")  # +100 to checking
+    _seed_entry(conn, 2, "2024-01-20", 200.00, item_id="item_B")  # +200 to checking
 
-        # Create entry for 100.00
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES(1, 'txn-001', '2024-01-15', 'Test', 'USD', 'hash1', 1, 'item_A')
-        """)
-        )
+    plaid_balances = {"plaid_checking": 100.00}  # Should match item A only
 
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),
-                (1, 2, 'credit', 100.00)
-        """)
-        )
-
-        # Balance exactly -0.01 lower than GL
-        plaid_balances = {"plaid_checking": 99.99}
+    # Run reconciliation scoped to item_A
+    result = run_reconciliation(
+        conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
+    )
 
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
+    # Should succeed because item_A GL balance = 100.00 matches plaid balance
+    assert result["success"] is True
+    assert result["total_variance"] == pytest.approx(0.00, abs=1e-2)
+
+    # Verify item scoping worked - only one account processed
+    assert len(result["by_account"]) == 1
+    acct = result["by_account"][0]
+    assert acct["variance"] == pytest.approx(0.00, abs=1e-2)
+
+
+@pytest.mark.parametrize(
+    ("ext_balance", "expected_ok", "expected_variance"),
+    [
+        pytest.param(100.009, True, 0.009, id="within-tolerance"),
+        pytest.param(100.015, False, 0.015, id="over-tolerance-after-rounding"),
+        pytest.param(100.01, True, 0.01, id="inclusive-positive"),
+        pytest.param(99.99, True, 0.01, id="inclusive-negative"),
+    ],
+)
+def test_reconcile_tolerance_boundary(
+    conn: Connection, ext_balance: float, expected_ok: bool, expected_variance: float
+) -> None:
+    """Test the ±0.01 cash-variance tolerance, inclusive at the boundary."""
+    _seed_checking(conn)
+
+    # Create entry for 100.00
+    _seed_entry(conn, 1, "2024-01-15", 100.00, item_id="item_A")
+
+    plaid_balances = {"plaid_checking": ext_balance}
+
+    result = run_reconciliation(
+        conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
+    )
 
-        # Should pass - tolerance is inclusive: abs(-0.01) <= 0.01
-        assert result["success"] is True
-        assert result["checks"]["cash_variance"]["passed"] is True
-        assert result["total_variance"] == pytest.approx(0.01, abs=1e-3)
+    # Tolerance is inclusive: abs(variance) <= 0.01 after rounding to cents
+    assert result["success"] is expected_ok
+    assert result["checks"]["cash_variance"]["passed"] is expected_ok
+    assert result["total_variance"] == pytest.approx(expected_variance, abs=1e-3)
 
 
-def test_reconcile_zero_gl_lines_counts_as_zero() -> None:
+def test_reconcile_zero_gl_lines_counts_as_zero(conn: Connection) -> None:
     """Test that mapped cash account with no lines in period has GL balance of 0.00."""
-    engine = create_engine("sqlite:///:memory:")
+    _seed_checking(conn, with_expense=False)
 
-    with engine.begin() as conn:
-        _create_test_schema(conn)
+    # No journal lines for this account/period
+    # GL balance should be 0.00
 
-        # Setup account
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
+    # External balance is also 0.00
+    plaid_balances = {"plaid_checking": 0.00}
 
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
-
-        # No journal lines for this account/period
-        # GL balance should be 0.00
-
-        # External balance is also 0.00
-        plaid_balances = {"plaid_checking": 0.00}
-
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
+    result = run_reconciliation(
+        conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
+    )
 
-        # Should pass - both GL and external are 0.00, variance = 0.00
-        assert result["success"] is True
-        assert result["checks"]["cash_variance"]["passed"] is True
-        assert result["total_variance"] == pytest.approx(0.00, abs=1e-3)
+    # Should pass - both GL and external are 0.00, variance = 0.00
+    assert result["success"] is True
+    assert result["checks"]["cash_variance"]["passed"] is True
+    assert result["total_variance"] == pytest.approx(0.00, abs=1e-3)
 
-        # Verify by_account breakdown shows 0.00 GL balance
-        assert len(result["by_account"]) == 1
-        assert result["by_account"][0]["plaid_account_id"] == "plaid_checking"
-        assert result["by_account"][0]["gl_asof"] == 0.00
-        assert result["by_account"][0]["ext_asof"] == 0.00
-        assert result["by_account"][0]["variance"] == 0.00
+    # Verify by_account breakdown shows 0.00 GL balance
+    assert len(result["by_account"]) == 1
+    assert result["by_account"][0]["plaid_account_id"] == "plaid_checking"
+    assert result["by_account"][0]["gl_asof"] == 0.00
+    assert result["by_account"][0]["ext_asof"] == 0.00
+    assert result["by_account"][0]["variance"] == 0.00
 
 
-def test_reconcile_inclusive_period_window() -> None:
+def test_reconcile_inclusive_period_window(conn: Connection) -> None:
     """Test that period window [from, to] is inclusive of boundary dates."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup account
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
+    _seed_checking(conn)
 
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
+    # Create entries on FIRST and LAST day of Q1 (2024-01-01 to 2024-03-31)
+    _seed_entry(conn, 1, "2024-01-01", 50.00, item_id="item_A")  # +50 on first day
+    _seed_entry(conn, 2, "2024-03-31", 30.00, item_id="item_A")  # +30 = 80 total
 
-        # Create entries on FIRST and LAST day of Q1 (2024-01-01 to 2024-03-31)
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id) VALUES
-                (
-                    1, 'first-day', '2024-01-01', 'Q1 First Day', 'USD',
-                    'hash1', 1, 'item_A'
-                ),
-                (
-                    2, 'last-day', '2024-03-31', 'Q1 Last Day', 'USD',
-                    'hash2', 1, 'item_A'
-                )
-        """)
-        )
+    plaid_balances = {"plaid_checking": 80.00}  # Should match both entries
 
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 50.00),    -- +50 on first day
-                (1, 2, 'credit', 50.00),
-                (2, 1, 'debit', 30.00),    -- +30 on last day = 80 total
-                (2, 2, 'credit', 30.00)
-        """)
-        )
-
-        plaid_balances = {"plaid_checking": 80.00}  # Should match both entries
-
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
+    result = run_reconciliation(
+        conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
+    )
 
-        # Should include both boundary date entries and pass reconciliation
-        assert result["success"] is True
-        assert result["total_variance"] == pytest.approx(0.00, abs=1e-2)
+    # Should include both boundary date entries and pass reconciliation
+    assert result["success"] is True
+    assert result["total_variance"] == pytest.approx(0.00, abs=1e-2)
 
 
-def test_coverage_ignores_extras_but_fails_on_missing() -> None:
+def test_coverage_ignores_extras_but_fails_on_missing(conn: Connection) -> None:
     """Test that coverage check ignores extras but fails on missing mapped accounts."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup ONE mapped cash account
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
-
-        # Test 1: Extra account in plaid_balances should be ignored (pass)
-        plaid_balances_with_extra = {
-            "plaid_checking": 0.00,  # Mapped
-            "plaid_unmapped": 50.00,  # Extra - should be ignored
-        }
-
-        result = run_reconciliation(
-            conn,
-            period="2024Q1",
-            item_id="item_A",
-            plaid_balances=plaid_balances_with_extra,
-        )
+    _seed_checking(conn)
+
+    # Test 1: Extra account in plaid_balances should be ignored (pass)
+    plaid_balances_with_extra = {
+        "plaid_checking": 0.00,  # Mapped
+        "plaid_unmapped": 50.00,  # Extra - should be ignored
+    }
+
+    result = run_reconciliation(
+        conn,
+        period="2024Q1",
+        item_id="item_A",
+        plaid_balances=plaid_balances_with_extra,
+    )
 
-        assert result["checks"]["coverage"]["passed"] is True  # Extras ignored per ADR
-        assert "extra" in result["checks"]["coverage"]
-        assert "plaid_unmapped" in result["checks"]["coverage"]["extra"]
+    assert result["checks"]["coverage"]["passed"] is True  # Extras ignored per ADR
+    assert "extra" in result["checks"]["coverage"]
+    assert "plaid_unmapped" in result["checks"]["coverage"]["extra"]
 
-        # Test 2: Missing mapped account should fail coverage
-        plaid_balances_missing_mapped = {
-            "plaid_unmapped": 50.00,  # Only extra, missing the required mapped one
-        }
+    # Test 2: Missing mapped account should fail coverage
+    plaid_balances_missing_mapped = {
+        "plaid_unmapped": 50.00,  # Only extra, missing the required mapped one
+    }
 
-        result = run_reconciliation(
-            conn,
-            period="2024Q1",
-            item_id="item_A",
-            plaid_balances=plaid_balances_missing_mapped,
-        )
+    result = run_reconciliation(
+        conn,
+        period="2024Q1",
+        item_id="item_A",
+        plaid_balances=plaid_balances_missing_mapped,
+    )
 
-        assert result["checks"]["coverage"]["passed"] is False
-        assert "missing" in result["checks"]["coverage"]
-        assert "plaid_checking" in result["checks"]["coverage"]["missing"]
-        assert result["success"] is False  # Overall failure due to coverage
+    assert result["checks"]["coverage"]["passed"] is False
+    assert "missing" in result["checks"]["coverage"]
+    assert "plaid_checking" in result["checks"]["coverage"]["missing"]
+    assert result["success"] is False  # Overall failure due to coverage
 
 
-def test_pure_function_never_writes_events() -> None:
+def test_pure_function_never_writes_events(conn: Connection) -> None:
     """Test that run_reconciliation() pure function never writes to etl_events table."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup minimal data for a successful reconciliation
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
+    _seed_checking(conn, with_expense=False)
 
-        # Run reconciliation (should be pure, no side effects)
-        plaid_balances = {"plaid_checking": 0.00}
+    # Run reconciliation (should be pure, no side effects)
+    plaid_balances = {"plaid_checking": 0.00}
+    with _track_writes(conn) as writes:
         result = run_reconciliation(
             conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
         )
 
-        # Verify reconciliation worked
-        assert result["success"] is True
+    # Verify reconciliation worked
+    assert result["success"] is True
 
-        # Verify NO events were written (pure function boundary)
-        event_count = conn.execute(text("SELECT COUNT(*) FROM etl_events")).scalar()
-        assert event_count == 0, (
-            "Pure function run_reconciliation() must not write to etl_events"
-        )
-
-
-def test_tolerance_is_inclusive_at_boundary() -> None:
-    """Test that tolerance check is inclusive: exactly 0.01 variance passes."""
-    engine = create_engine("sqlite:///:memory:")
-
-    with engine.begin() as conn:
-        _create_test_schema(conn)
-
-        # Setup account
-        conn.execute(
-            text("""
-            INSERT INTO accounts (id, code, name, type, is_cash) VALUES
-                (1, 'Assets:Bank:Checking', 'Checking', 'asset', 1),
-                (2, 'Expenses:Other', 'Other', 'expense', 0)
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO plaid_accounts (plaid_account_id, name, type, subtype, currency)
-            VALUES('plaid_checking', 'Checking', 'depository', 'checking', 'USD')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO account_links (plaid_account_id, account_id)
-            VALUES('plaid_checking', 1)
-        """)
-        )
-
-        # Create entry for exact boundary case
-        conn.execute(
-            text("""
-            INSERT INTO journal_entries (id, txn_id, txn_date, description, currency,
-                                        source_hash, transform_version, item_id)
-            VALUES(1, 'txn-001', '2024-01-15', 'Test', 'USD', 'hash1', 1, 'item_A')
-        """)
-        )
-
-        conn.execute(
-            text("""
-            INSERT INTO journal_lines (entry_id, account_id, side, amount) VALUES
-                (1, 1, 'debit', 100.00),
-                (1, 2, 'credit', 100.00)
-        """)
-        )
-
-        # External balance differs by exactly 0.01 (boundary case)
-        plaid_balances = {"plaid_checking": 100.01}
-
-        result = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances
-        )
-
-        # Exactly 0.01 variance should pass (inclusive boundary)
-        assert result["checks"]["cash_variance"]["passed"] is True
-        assert result["total_variance"] == pytest.approx(0.01, abs=1e-3)
-        assert result["success"] is True
-
-        # Test just over boundary (should fail) - use 0.015 which rounds to 0.02
-        plaid_balances_over = {"plaid_checking": 100.015}
-
-        result_over = run_reconciliation(
-            conn, period="2024Q1", item_id="item_A", plaid_balances=plaid_balances_over
-        )
-
-        assert result_over["checks"]["cash_variance"]["passed"] is False
-        assert result_over["success"] is False
+    # Verify NO events were written (pure function boundary)
+    assert writes == [], (
+        "Pure function run_reconciliation() must not write to the database"
+    )
+    assert conn.execute(_COUNT_EVENTS).scalar() == 0, (
+        "Pure function run_reconciliation() must not write to etl_events"
+    )
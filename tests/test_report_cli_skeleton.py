@@ -14,9 +14,56 @@ from cli import app
 from sqlalchemy import create_engine, text
 from typer.testing import CliRunner
 
+from tests.conftest import run_script
+
 runner = CliRunner()
 
 
+# IF NOT EXISTS and INSERT OR IGNORE let the seed rerun against an existing file
+_SCHEMA_DDL = """
+CREATE TABLE IF NOT EXISTS accounts (
+    id TEXT PRIMARY KEY,
+    code TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    is_cash BOOLEAN NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS journal_entries (
+    id TEXT PRIMARY KEY,
+    item_id TEXT,
+    txn_id TEXT UNIQUE NOT NULL,
+    txn_date DATE NOT NULL,
+    description TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    transform_version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS journal_lines (
+    id TEXT PRIMARY KEY,
+    entry_id TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    side TEXT NOT NULL,
+    amount DECIMAL(18,2) NOT NULL
+);
+"""
+
+_INS_ACCOUNT = text(
+    "INSERT OR IGNORE INTO accounts (id, code, name, type, is_cash) "
+    "VALUES (:id, :code, :name, :type, :is_cash)"
+)
+_INS_ENTRY = text(
+    "INSERT OR IGNORE INTO journal_entries (id, item_id, txn_id, "
+    "txn_date, description, currency, source_hash, transform_version) "
+    "VALUES (:id, :item_id, :txn_id, :txn_date, :description, "
+    ":currency, :source_hash, :transform_version)"
+)
+_INS_LINE = text(
+    "INSERT OR IGNORE INTO journal_lines "
+    "(id, entry_id, account_id, side, amount) "
+    "VALUES (:id, :entry_id, :account_id, :side, :amount)"
+)
+
+
 def _seed_minimal_reporting_schema(engine_url: str) -> None:
     """Create a minimal schema and seed one balanced entry.
 
@@ -25,88 +72,61 @@ def _seed_minimal_reporting_schema(engine_url: str) -> None:
     """
     engine = create_engine(engine_url)
     with engine.begin() as conn:
-        conn.execute(
-            text(
-                """
-                CREATE TABLE IF NOT EXISTS accounts (
-                    id TEXT PRIMARY KEY,
-                    code TEXT UNIQUE NOT NULL,
-                    name TEXT NOT NULL,
-                    type TEXT NOT NULL,
-                    is_cash BOOLEAN NOT NULL DEFAULT 0
-                )
-                """
-            )
-        )
-
-        conn.execute(
-            text(
-                """
-                CREATE TABLE IF NOT EXISTS journal_entries (
-                    id TEXT PRIMARY KEY,
-                    item_id TEXT,
-                    txn_id TEXT UNIQUE NOT NULL,
-                    txn_date DATE NOT NULL,
-                    description TEXT NOT NULL,
-                    currency TEXT NOT NULL,
-                    source_hash TEXT NOT NULL,
-                    transform_version INTEGER NOT NULL
-                )
-                """
-            )
-        )
-
-        conn.execute(
-            text(
-                """
-                CREATE TABLE IF NOT EXISTS journal_lines (
-                    id TEXT PRIMARY KEY,
-                    entry_id TEXT NOT NULL,
-                    account_id TEXT NOT NULL,
-                    side TEXT NOT NULL,
-                    amount DECIMAL(18,2) NOT NULL
-                )
-                """
-            )
-        )
+        run_script(conn, _SCHEMA_DDL)
 
         # Seed minimal accounts and one balanced entry (2024Q1)
         conn.execute(
-            text(
-                """
-                INSERT OR IGNORE INTO accounts (id, code, name, type, is_cash) VALUES
-                    ('acc1', 'Assets:Bank:Checking', 'Bank Checking Account',
-                     'asset', 1),
-                    ('acc2', 'Expenses:Dining:Restaurants', 'Restaurant Expenses',
-                     'expense', 0)
-                """
-            )
+            _INS_ACCOUNT,
+            [
+                {
+                    "id": "acc1",
+                    "code": "Assets:Bank:Checking",
+                    "name": "Bank Checking Account",
+                    "type": "asset",
+                    "is_cash": 1,
+                },
+                {
+                    "id": "acc2",
+                    "code": "Expenses:Dining:Restaurants",
+                    "name": "Restaurant Expenses",
+                    "type": "expense",
+                    "is_cash": 0,
+                },
+            ],
         )
 
         conn.execute(
-            text(
-                """
-                INSERT OR IGNORE INTO journal_entries (
-                    id, item_id, txn_id, txn_date, description, currency,
-                    source_hash, transform_version
-                ) VALUES (
-                    'entry1', 'test_item', 'test_txn_001', '2024-01-15',
-                    'Test Restaurant Purchase', 'USD', 'abc123def456', 1
-                )
-                """
-            )
+            _INS_ENTRY,
+            {
+                "id": "entry1",
+                "item_id": "test_item",
+                "txn_id": "test_txn_001",
+                "txn_date": "2024-01-15",
+                "description": "Test Restaurant Purchase",
+                "currency": "USD",
+                "source_hash": "abc123def456",
+                "transform_version": 1,
+            },
         )
 
         conn.execute(
-            text(
-                """
-                INSERT OR IGNORE INTO journal_lines (
-                    id, entry_id, account_id, side, amount
-                ) VALUES
-                    ('line1', 'entry1', 'acc2', 'debit', 25.00),
-                    ('line2', 'entry1', 'acc1', 'credit', 25.00)
-                """
-            )
+            _INS_LINE,
+            [
+                {
+                    "id": "line1",
+                    "entry_id": "entry1",
+                    "account_id": "acc2",
+                    "side": "debit",
+                    "amount": 25.00,
+                },
+                {
+                    "id": "line2",
+                    "entry_id": "entry1",
+                    "account_id": "acc1",
+                    "side": "credit",
+                    "amount": 25.00,
+                },
+            ],
         )
 
 
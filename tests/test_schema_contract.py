@@ -4,44 +4,86 @@ from __future__ import annotations
 
 import re
 from pathlib import Path
+from typing import NamedTuple
 
+import pytest
 
-def test_journal_entries_fixtures_include_item_id() -> None:
+_CREATE_JE_RE = re.compile(
+    r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?journal_entries\s*\(",
+    re.IGNORECASE | re.MULTILINE,
+)
+_ITEM_ID_RE = re.compile(r"^\s*item_id\b", re.IGNORECASE | re.MULTILINE)
+_CREATE_INGEST_RE = re.compile(
+    r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?ingest_accounts\s*\(",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Both Step B requirements in one pattern, so a table definition is scanned once
+_INGEST_REQUIREMENTS_RE = re.compile(
+    r"(?P<not_null>^\s*item_id\s+TEXT\s+NOT\s+NULL\b)"
+    r"|(?P<composite_pk>PRIMARY\s+KEY\s*\(\s*item_id\s*,\s*plaid_account_id\s*\))",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+class _IngestViolation(NamedTuple):
+    """An ingest_accounts definition missing one or both Step B requirements."""
+
+    file: str
+    table_def: str
+    has_item_id_not_null: bool
+    has_composite_pk: bool
+
+
+@pytest.fixture(scope="module")
+def sources() -> dict[Path, str]:
+    """Every test module's source, read once and shared by the contract scans."""
+    return {
+        path: path.read_text(encoding="utf-8") for path in Path("tests").rglob("*.py")
+    }
+
+
+def _statement_end(content: str, open_paren: int) -> int:
+    """Return the index just past the ``)`` matching ``content[open_paren]``.
+
+    Walks the parentheses with str.find instead of visiting every character.
+    Returns -1 if they never balance.
+    """
+    depth = 1
+    pos = open_paren
+    while depth:
+        close = content.find(")", pos + 1)
+        if close == -1:
+            return -1
+        opening = content.find("(", pos + 1, close)
+        if opening == -1:
+            depth -= 1
+            pos = close
+        else:
+            depth += 1
+            pos = opening
+    return pos + 1
+
+
+def test_journal_entries_fixtures_include_item_id(sources: dict[Path, str]) -> None:
     """Test that all CREATE TABLE journal_entries in test files include item_id column.
 
     Per ADR 1.5.1: journal_entries.item_id is part of the schema contract.
     All test fixtures must comply to prevent drift.
     """
-    test_files = list(Path("tests").rglob("*.py"))
     violations = []
 
-    for file_path in test_files:
-        with file_path.open() as f:
-            content = f.read()
+    for file_path, content in sources.items():
+        # Cheap substring guard first; the pattern is case-insensitive, so is this
+        if "journal_entries" not in content.lower():
+            continue
 
         # Find all CREATE TABLE journal_entries statements
-        create_patterns = re.finditer(
-            r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?journal_entries\s*\(",
-            content,
-            re.IGNORECASE | re.MULTILINE,
-        )
+        create_patterns = _CREATE_JE_RE.finditer(content)
 
         for match in create_patterns:
             # Extract the full CREATE TABLE statement
             start = match.start()
-            paren_count = 0
-            end = start
-            in_create = False
-
-            for i, char in enumerate(content[start:]):
-                if char == "(":
-                    paren_count += 1
-                    in_create = True
-                elif char == ")" and in_create:
-                    paren_count -= 1
-                    if paren_count == 0:
-                        end = start + i + 1
-                        break
+            end = _statement_end(content, match.end() - 1)
 
             if end > start:
                 table_def = content[start:end]
@@ -51,9 +93,7 @@ def test_journal_entries_fixtures_include_item_id() -> None:
                     continue
 
                 # Check if item_id column exists as actual column definition
-                if not re.search(
-                    r"^\s*item_id\b", table_def, re.IGNORECASE | re.MULTILINE
-                ):
+                if not _ITEM_ID_RE.search(table_def):
                     violations.append({
                         "file": str(file_path),
                         "table_def": table_def[:200] + "..."
@@ -76,43 +116,28 @@ def test_journal_entries_fixtures_include_item_id() -> None:
         raise AssertionError(msg)
 
 
-def test_ingest_accounts_fixtures_include_composite_pk() -> None:  # noqa: PLR0912
+def test_ingest_accounts_fixtures_include_composite_pk(
+    sources: dict[Path, str],
+) -> None:
     """Test that all CREATE TABLE ingest_accounts include composite PK.
 
     Per Step B migration: ingest_accounts must have composite PRIMARY KEY
     (item_id, plaid_account_id) and NOT NULL constraints. This prevents
     schema drift in test fixtures.
     """
-    test_files = list(Path("tests").rglob("*.py"))
-    violations = []
+    violations: list[_IngestViolation] = []
 
-    for file_path in test_files:
-        with file_path.open() as f:
-            content = f.read()
+    for file_path, content in sources.items():
+        if "ingest_accounts" not in content.lower():
+            continue
 
         # Find all CREATE TABLE ingest_accounts statements
-        create_patterns = re.finditer(
-            r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?ingest_accounts\s*\(",
-            content,
-            re.IGNORECASE | re.MULTILINE,
-        )
+        create_patterns = _CREATE_INGEST_RE.finditer(content)
 
         for match in create_patterns:
             # Extract the full CREATE TABLE statement
             start = match.start()
-            paren_count = 0
-            end = start
-            in_create = False
-
-            for i, char in enumerate(content[start:]):
-                if char == "(":
-                    paren_count += 1
-                    in_create = True
-                elif char == ")" and in_create:
-                    paren_count -= 1
-                    if paren_count == 0:
-                        end = start + i + 1
-                        break
+            end = _statement_end(content, match.end() - 1)
 
             if end > start:
                 table_def = content[start:end]
@@ -124,37 +149,37 @@ def test_ingest_accounts_fixtures_include_composite_pk() -> None:  # noqa: PLR09
                 # Check requirements for Step B compliance:
                 # 1. item_id column with NOT NULL
                 # 2. Composite PRIMARY KEY (item_id, plaid_account_id)
-                has_item_id_not_null = re.search(
-                    r"^\s*item_id\s+TEXT\s+NOT\s+NULL\b",
-                    table_def,
-                    re.IGNORECASE | re.MULTILINE,
-                )
-                has_composite_pk = re.search(
-                    r"PRIMARY\s+KEY\s*\(\s*item_id\s*,\s*plaid_account_id\s*\)",
-                    table_def,
-                    re.IGNORECASE,
-                )
+                found = {
+                    requirement
+                    for m in _INGEST_REQUIREMENTS_RE.finditer(table_def)
+                    for requirement, matched in m.groupdict().items()
+                    if matched
+                }
+                has_item_id_not_null = "not_null" in found
+                has_composite_pk = "composite_pk" in found
 
                 if not (has_item_id_not_null and has_composite_pk):
-                    violations.append({
-                        "file": str(file_path),
-                        "table_def": table_def[:300] + "..."
-                        if len(table_def) > 300
-                        else table_def,
-                        "has_item_id_not_null": bool(has_item_id_not_null),
-                        "has_composite_pk": bool(has_composite_pk),
-                    })
+                    violations.append(
+                        _IngestViolation(
+                            file=str(file_path),
+                            table_def=table_def[:300] + "..."
+                            if len(table_def) > 300
+                            else table_def,
+                            has_item_id_not_null=has_item_id_not_null,
+                            has_composite_pk=has_composite_pk,
+                        )
+                    )
 
     if violations:
         violation_details = []
         for v in violations:
             missing = []
-            if not v["has_item_id_not_null"]:
+            if not v.has_item_id_not_null:
                 missing.append("item_id TEXT NOT NULL")
-            if not v["has_composite_pk"]:
+            if not v.has_composite_pk:
                 missing.append("PRIMARY KEY (item_id, plaid_account_id)")
             violation_details.append(
-                f"- {v['file']}: Missing {', '.join(missing)}\n  {v['table_def']}"
+                f"- {v.file}: Missing {', '.join(missing)}\n  {v.table_def}"
             )
 
         fix_hint = (
@@ -169,16 +194,12 @@ def test_ingest_accounts_fixtures_include_composite_pk() -> None:  # noqa: PLR09
         raise AssertionError(msg)
 
 
-def test_all_test_schemas_are_discoverable() -> None:
+def test_all_test_schemas_are_discoverable(sources: dict[Path, str]) -> None:
     """Ensure our schema scanning logic can find CREATE TABLE statements correctly."""
     # This is a meta-test to verify our scanning works
-    test_files = list(Path("tests").rglob("*.py"))
     found_any_journal_entries = False
 
-    for file_path in test_files:
-        with file_path.open() as f:
-            content = f.read()
-
+    for content in sources.values():
         if "CREATE TABLE journal_entries" in content:
             found_any_journal_entries = True
             break
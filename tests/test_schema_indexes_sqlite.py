@@ -83,3 +83,55 @@ def test_journal_entries_item_date_index_exists_sqlite(tmp_path: Path) -> None:
             f"idx_journal_entries_item_date has wrong column order: {col_names}. "
             f"Expected: ['item_id', 'txn_date'] for optimal query performance."
         )
+
+
+def test_etl_events_latest_by_type_uses_event_type_index_sqlite(
+    tmp_path: Path,
+) -> None:
+    """Test the latest-event-by-type lookup is served by idx_etl_events_event_type.
+
+    etl_events.id is the INTEGER PRIMARY KEY (rowid), which SQLite appends to
+    every index, so (event_type) already orders rows by id within a type: no
+    separate (event_type, id DESC) index and no temp sort are needed.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+
+    with engine.begin() as conn:
+        # Mirrors schema_sqlite.sql etl_events and its sqlite_shim.sql index
+        conn.execute(
+            text("""
+            CREATE TABLE etl_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_type TEXT NOT NULL,
+                item_id TEXT,
+                period TEXT,
+                success BOOLEAN NOT NULL,
+                row_counts TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                finished_at TEXT NOT NULL
+            )
+        """)
+        )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_etl_events_event_type "
+                "ON etl_events(event_type)"
+            )
+        )
+
+        plan_rows = conn.execute(
+            text("""
+            EXPLAIN QUERY PLAN
+            SELECT row_counts, success FROM etl_events
+            WHERE event_type = 'reconcile'
+            ORDER BY id DESC LIMIT 1
+        """)
+        ).fetchall()
+        plan = " | ".join(row[3] for row in plan_rows)  # row[3] = detail
+
+        assert "USING INDEX idx_etl_events_event_type" in plan, (
+            f"Latest-event lookup does not use idx_etl_events_event_type: {plan}"
+        )
+        assert "TEMP B-TREE" not in plan, (
+            f"Latest-event lookup sorts instead of walking the index: {plan}"
+        )